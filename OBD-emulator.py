@@ -0,0 +1,502 @@
+"""
+=======================================================================
+    ELM327 Emulator — Hardware-free OBD-II adapter over a pseudo-terminal
+=======================================================================
+
+📄 File Name: OBD-emulator.py
+📅 Last Modified: 2026-10-17
+
+📄 Description:
+    Emulates an ELM327 v1.5 adapter connected to a CAN (ISO 15765-4,
+    11-bit, 500 kbaud) vehicle. The emulator opens a pseudo-terminal and
+    answers on it exactly like the real adapter, so the loggers can connect
+    to it unmodified with OBD(portstr=<pty path>, baudrate=BAUDRATE) and
+    connection and query performance can be measured without a car.
+
+🔧 Features:
+    - Answers the AT commands used by python-OBD and the loggers
+      (ATZ, ATI, ATE, ATH, ATL, ATS, ATSP, ATTP, ATDP(N), ATRV, ATST, ATAT...).
+    - Mode 01 single- and multi-PID requests (up to six PIDs), including
+      the 0100/0120/0140 support bitmaps and the response-count hint digit.
+    - Mode 09 VIN (multi-frame ISO-TP framing).
+    - Realistic CAN framing with headers on or off, optional second ECU.
+    - Configurable per-command latency, jitter, response timeout
+      (ATST / adaptive timing) and unsupported PIDs.
+    - Values are replayed from a dataset CSV (obd_dataset.csv or the
+      numeric dataset, optionally .gz/.zst compressed) or generated from a
+      synthetic drive cycle.
+
+▶ Usage:
+    python OBD-emulator.py --csv obd_dataset.csv --latency 40 --jitter 10
+    python OBD-emulator.py --generate --unsupported 5C,0A --link /tmp/ttyOBD
+
+    The emulator prints the pty path (e.g. /dev/pts/5); pass it as the
+    port to the logger. Pseudo-terminals require Linux or macOS.
+
+🛠 Dependencies:
+    - Python standard library only
+    - dataset_codec.py (in this directory; reads compressed datasets)
+    - zstandard (optional, to replay .zst datasets)
+"""
+import argparse
+import csv
+import io
+import math
+import os
+import random
+import re
+import select
+import sys
+import time
+import tty
+
+from dataset_codec import read_dataset_text
+
+# -------------------- Global Settings --------------------
+ELM_VERSION = "ELM327 v1.5"
+DEVICE_DESCRIPTION = "OBDII to RS232 Interpreter"
+PROTOCOL_ID = "6"
+PROTOCOL_NAME = "ISO 15765-4 (CAN 11/500)"
+BATTERY_VOLTAGE = "12.6V"
+DEFAULT_VIN = "LVVDB21B8PD000123"
+DEFAULT_LATENCY_MS = 30.0     # ECU response time for OBD requests
+DEFAULT_AT_LATENCY_MS = 2.0   # Adapter response time for AT commands
+ROW_PERIOD = 1.0              # Seconds each replayed dataset row stays current
+
+ENGINE_TX_ID = 0x7E8
+TRANSMISSION_TX_ID = 0x7E9
+
+# -------------------- PID Table --------------------
+def _percent(value):
+    return [round(value * 255 / 100)]
+
+def _temp(value):
+    return [round(value) + 40]
+
+def _rpm(value):
+    raw = round(value * 4)
+    return [raw >> 8, raw & 0xFF]
+
+def _speed(value):
+    return [round(value)]
+
+def _fuel_pressure(value):
+    return [round(value / 3)]
+
+# PID -> (dataset column, encoder turning a metric value into data bytes)
+PIDS = {
+    0x04: ("Engine Load", _percent),
+    0x05: ("Coolant Temp", _temp),
+    0x0A: ("Fuel Pressure", _fuel_pressure),
+    0x0C: ("Engine RPM", _rpm),
+    0x0D: ("Speed", _speed),
+    0x0F: ("Intake Temp", _temp),
+    0x11: ("Throttle Pos", _percent),
+    0x2F: ("Fuel Level", _percent),
+    0x46: ("Ambient Temp", _temp),
+    0x5C: ("Oil Temp", _temp),
+}
+
+# PIDs the optional second ECU (transmission) answers besides the bitmaps
+TRANSMISSION_PIDS = {0x0D}
+
+# -------------------- Value Sources --------------------
+class CSVReplay:
+    """
+    Replays sensor values from a dataset CSV, one row every `row_period`
+    seconds, looping at the end. Accepts both the unit-suffixed dataset
+    ("78 °C", "N/A") and the numeric dataset (plain numbers, empty cells),
+    plain or gzip/zstd compressed.
+    """
+    def __init__(self, file_path, row_period=ROW_PERIOD):
+        """
+        Args:
+            file_path: The path to the dataset CSV.
+            row_period: Seconds each row stays current.
+        """
+        self.row_period = row_period
+        self.rows = []
+        for record in csv.DictReader(io.StringIO(read_dataset_text(file_path), newline='')):
+            self.rows.append({pid: parse_number(record.get(column))
+                              for pid, (column, _) in PIDS.items()})
+        if not self.rows:
+            raise ValueError(f"No rows found in {file_path}")
+        self.start = time.monotonic()
+
+    def available_pids(self):
+        """Returns the PIDs that have a value in at least one row."""
+        return {pid for row in self.rows for pid, value in row.items() if value is not None}
+
+    def value(self, pid):
+        """Returns the current value of a PID, or None if the row has none."""
+        index = int((time.monotonic() - self.start) / self.row_period) % len(self.rows)
+        return self.rows[index].get(pid)
+
+
+class DriveCycle:
+    """Generates plausible sensor values from a synthetic stop-and-go drive."""
+    def __init__(self):
+        self.start = time.monotonic()
+
+    def available_pids(self):
+        """Returns the PIDs this source can generate."""
+        return set(PIDS)
+
+    def value(self, pid):
+        """Returns the current value of a PID."""
+        t = time.monotonic() - self.start
+        phase = (1 - math.cos(2 * math.pi * t / 60.0)) / 2  # 0..1 over a 60 s cycle
+        values = {
+            0x04: 25 + 45 * phase,
+            0x05: min(90, 60 + t / 20),
+            0x0A: 350,
+            0x0C: 750 + 2250 * phase + 20 * math.sin(t * 7),
+            0x0D: 80 * phase,
+            0x0F: 45 + 5 * phase,
+            0x11: 12.5 + 30 * phase,
+            0x2F: max(0, 80 - t / 600),
+            0x46: 35,
+            0x5C: min(100, 65 + t / 30),
+        }
+        return values.get(pid)
+
+
+def parse_number(text):
+    """
+    Extracts the leading number from a dataset cell such as "78 °C".
+
+    Returns:
+        The number as a float, or None for empty or "N/A" cells.
+    """
+    if not text:
+        return None
+    match = re.match(r"\s*(-?\d+\.?\d*)", text)
+    return float(match.group(1)) if match else None
+
+# -------------------- CAN Framing --------------------
+def can_frames(tx_id, payload):
+    """
+    Splits a response payload into ISO-TP CAN frames (PCI byte included).
+
+    Args:
+        tx_id: The 11-bit CAN ID of the responding ECU.
+        payload: The response bytes, e.g. [0x41, 0x0C, 0x0B, 0xA6].
+
+    Returns:
+        A list of (tx_id, frame_bytes) tuples.
+    """
+    if len(payload) <= 7:
+        return [(tx_id, [len(payload)] + payload)]
+    frames = [(tx_id, [0x10 | (len(payload) >> 8), len(payload) & 0xFF] + payload[:6])]
+    rest = payload[6:]
+    seq = 1
+    while rest:
+        chunk = rest[:7]
+        rest = rest[7:]
+        frames.append((tx_id, [0x20 | (seq & 0x0F)] + chunk + [0x00] * (7 - len(chunk))))
+        seq += 1
+    return frames
+
+# -------------------- ELM327 Emulation --------------------
+class ELM327Emulator:
+    """
+    The adapter state machine: parses requests, tracks AT settings and
+    produces the response text together with its simulated latency.
+    """
+    def __init__(self, source, latency_ms=DEFAULT_LATENCY_MS, jitter_ms=0.0,
+                 command_latency=None, unsupported=(), vin=DEFAULT_VIN, ecus=1):
+        """
+        Args:
+            source: A value source (CSVReplay or DriveCycle).
+            latency_ms: ECU response time for OBD requests.
+            jitter_ms: Standard deviation of random extra latency.
+            command_latency: Dict of per-command latency overrides in ms,
+                keyed by normalized command (e.g. {"0902": 300, "ATZ": 1000}).
+            unsupported: PIDs to report as unsupported.
+            vin: The VIN answered to 0902.
+            ecus: Number of responding ECUs (1 = engine, 2 = + transmission).
+        """
+        self.source = source
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.command_latency = command_latency or {}
+        self.supported = source.available_pids() - set(unsupported)
+        self.vin = vin
+        self.ecus = ecus
+        self.last_command = ""
+        self.reset()
+
+    def reset(self):
+        """Restores the power-on AT settings (ATZ / ATD)."""
+        self.echo = True
+        self.headers = False
+        self.linefeeds = False
+        self.spaces = True
+        self.adaptive = 1
+        self.timeout_ms = 0x32 * 4
+        self.auto_protocol = True
+
+    def handle(self, raw):
+        """
+        Handles one request line (without the trailing CR).
+
+        Returns:
+            A tuple (response_text, delay_seconds). The text ends with the
+            '>' prompt and includes the echo when echo is enabled.
+        """
+        command = raw.strip().upper().replace(" ", "")
+        if not command:
+            command = self.last_command
+        else:
+            self.last_command = command
+
+        if command.startswith("AT"):
+            lines, delay = self.handle_at(command[2:])
+        elif re.fullmatch(r"[0-9A-F]+", command or "-"):
+            lines, delay = self.handle_obd(command)
+        else:
+            lines, delay = ["?"], DEFAULT_AT_LATENCY_MS / 1000
+
+        override = self.command_latency.get(command)
+        if override is not None:
+            delay = override / 1000
+
+        eol = "\r\n" if self.linefeeds else "\r"
+        text = eol.join(lines) + eol + eol + ">"
+        if self.echo:
+            text = raw + "\r" + text
+        return text, delay
+
+    def handle_at(self, cmd):
+        """Handles an AT command (without the 'AT' prefix)."""
+        delay = DEFAULT_AT_LATENCY_MS / 1000
+        if cmd in ("Z", "WS"):
+            self.reset()
+            return ["", ELM_VERSION], 0.5 if cmd == "Z" else delay
+        if cmd == "D":
+            self.reset()
+            return ["OK"], delay
+        if cmd == "I":
+            return [ELM_VERSION], delay
+        if cmd == "@1":
+            return [DEVICE_DESCRIPTION], delay
+        if cmd == "RV":
+            return [BATTERY_VOLTAGE], delay
+        if cmd == "DP":
+            return [("AUTO, " if self.auto_protocol else "") + PROTOCOL_NAME], delay
+        if cmd == "DPN":
+            return [("A" if self.auto_protocol else "") + PROTOCOL_ID], delay
+        flags = {"E": "echo", "H": "headers", "L": "linefeeds", "S": "spaces"}
+        if len(cmd) == 2 and cmd[0] in flags and cmd[1] in "01":
+            setattr(self, flags[cmd[0]], cmd[1] == "1")
+            return ["OK"], delay
+        if re.fullmatch(r"AT[012]", cmd):
+            self.adaptive = int(cmd[2])
+            return ["OK"], delay
+        if re.fullmatch(r"ST[0-9A-F]{1,2}", cmd):
+            value = int(cmd[2:], 16)
+            self.timeout_ms = (value or 0x32) * 4
+            return ["OK"], delay
+        if re.fullmatch(r"S[PT]A?[0-9A-C]", cmd):
+            # Any protocol is accepted; the emulated vehicle always answers on CAN 11/500
+            self.auto_protocol = cmd[-1] == "0" or "A" in cmd[2:]
+            return ["OK"], delay
+        if re.fullmatch(r"(SH[0-9A-F]{3,8}|M[01]|CAF[01]|LP|PC|R[01]|AL|NL|CFC[01]|V[01]|KW[01]|IB\w+)", cmd):
+            return ["OK"], delay
+        return ["?"], delay
+
+    def handle_obd(self, command):
+        """Handles an OBD request such as "010C", "010C0D05" or "010C1"."""
+        mode = int(command[:2], 16)
+        body = command[2:]
+        expected = None
+        if len(body) % 2 == 1:
+            expected = int(body[-1], 16)  # response-count hint
+            body = body[:-1]
+        pids = [int(body[i:i + 2], 16) for i in range(0, len(body), 2)]
+
+        responses = []
+        if mode == 0x01 and 1 <= len(pids) <= 6:
+            responses = self.mode01(pids)
+        elif mode == 0x09 and len(pids) == 1:
+            responses = self.mode09(pids[0])
+
+        frames = []
+        for tx_id, payload in responses:
+            frames += can_frames(tx_id, payload)
+        lines = self.format_frames(frames) if frames else ["NO DATA"]
+        return lines, self.response_delay(command, len(frames), expected)
+
+    def mode01(self, pids):
+        """Builds the Mode 01 payloads of every responding ECU."""
+        responses = []
+        ecu_pids = [(ENGINE_TX_ID, self.supported)]
+        if self.ecus > 1:
+            ecu_pids.append((TRANSMISSION_TX_ID, self.supported & TRANSMISSION_PIDS))
+        for tx_id, supported in ecu_pids:
+            payload = [0x41]
+            for pid in pids:
+                data = self.pid_data(pid, supported)
+                if data is not None:
+                    payload += [pid] + data
+            if len(payload) > 1:
+                responses.append((tx_id, payload))
+        return responses
+
+    def pid_data(self, pid, supported):
+        """Returns the data bytes of one PID, or None if it has no answer."""
+        if pid % 0x20 == 0:
+            if pid and not any(p > pid for p in supported):
+                return None
+            return support_bitmap(supported, pid)
+        if pid not in supported:
+            return None
+        value = self.source.value(pid)
+        if value is None:
+            return None
+        return [max(0, min(255, b)) for b in PIDS[pid][1](value)]
+
+    def mode09(self, pid):
+        """Builds the Mode 09 payload (supported PIDs and VIN)."""
+        if pid == 0x00:
+            return [(ENGINE_TX_ID, [0x49, 0x00, 0x40, 0x00, 0x00, 0x00])]
+        if pid == 0x02:
+            return [(ENGINE_TX_ID, [0x49, 0x02, 0x01] + list(self.vin.encode('ascii')))]
+        return []
+
+    def format_frames(self, frames):
+        """Formats CAN frames the way the ELM327 prints them."""
+        sep = " " if self.spaces else ""
+        if self.headers:
+            return [f"{tx_id:03X}{sep}" + sep.join(f"{b:02X}" for b in data) for tx_id, data in frames]
+        lines = []
+        index = 0
+        for _, data in frames:
+            pci = data[0] >> 4
+            if pci == 0:
+                # Single frame: the PCI byte is not printed
+                lines.append(sep.join(f"{b:02X}" for b in data[1:]))
+            elif pci == 1:
+                # First frame: total length line, then numbered data lines
+                length = ((data[0] & 0x0F) << 8) | data[1]
+                lines += [f"{length:03X}", f"0:{sep}" + sep.join(f"{b:02X}" for b in data[2:])]
+                index = 0
+            else:
+                index += 1
+                lines.append(f"{index & 0x0F:X}:{sep}" + sep.join(f"{b:02X}" for b in data[1:]))
+        return lines
+
+    def response_delay(self, command, frame_count, expected):
+        """
+        Simulates how long the adapter takes before printing the prompt:
+        the ECU latency, then the wait for further responses. That wait is
+        skipped when the response-count hint has been met, shortened by
+        adaptive timing, and is the full ATST timeout otherwise.
+        """
+        latency = self.latency_ms + (random.gauss(0, self.jitter_ms) if self.jitter_ms else 0.0)
+        latency = max(0.0, latency)
+        if frame_count == 0:
+            wait = self.timeout_ms
+        elif expected is not None and frame_count >= expected:
+            wait = 0.0
+        elif self.adaptive == 2:
+            wait = min(self.timeout_ms, latency + 10)
+        elif self.adaptive == 1:
+            wait = min(self.timeout_ms, 2 * latency + 20)
+        else:
+            wait = self.timeout_ms
+        return (latency + wait) / 1000
+
+
+def support_bitmap(supported, base):
+    """
+    Builds the 4-byte "supported PIDs" bitmap for PIDs base+1 .. base+0x20.
+    The last bit is set when any PID above the range is supported.
+    """
+    bits = 0
+    for pid in range(base + 1, base + 0x21):
+        if pid in supported or (pid == base + 0x20 and any(p > pid for p in supported)):
+            bits |= 1 << (base + 0x20 - pid)
+    return list(bits.to_bytes(4, 'big'))
+
+# -------------------- Pseudo-terminal Server --------------------
+def serve(emulator, link=None):
+    """
+    Opens a pseudo-terminal and answers requests on it until interrupted.
+
+    Args:
+        emulator: The ELM327Emulator that produces the responses.
+        link: Optional path of a symlink to create for the pty.
+    """
+    master, slave = os.openpty()
+    tty.setraw(slave)
+    port = os.ttyname(slave)
+    if link:
+        if os.path.islink(link):
+            os.remove(link)
+        os.symlink(port, link)
+    print(f"🚗 ELM327 emulator listening on {port}" + (f" (linked as {link})" if link else ""))
+    print(f"📋 Supported PIDs: {', '.join(f'{p:02X}' for p in sorted(emulator.supported))}")
+
+    buffer = b""
+    try:
+        while True:
+            ready, _, _ = select.select([master], [], [], 0.5)
+            if not ready:
+                continue
+            try:
+                buffer += os.read(master, 1024)
+            except OSError:
+                time.sleep(0.1)  # no client attached to the slave side
+                continue
+            while b"\r" in buffer:
+                line, buffer = buffer.split(b"\r", 1)
+                request = line.decode('ascii', 'ignore').replace("\n", "")
+                response, delay = emulator.handle(request)
+                time.sleep(delay)
+                os.write(master, response.encode('ascii'))
+    finally:
+        if link and os.path.islink(link):
+            os.remove(link)
+        os.close(master)
+        os.close(slave)
+
+
+def parse_args(argv=None):
+    """Parses the command-line options."""
+    parser = argparse.ArgumentParser(description="ELM327 emulator on a pseudo-terminal.")
+    src = parser.add_mutually_exclusive_group()
+    src.add_argument("--csv", default="obd_dataset.csv", help="dataset CSV to replay values from")
+    src.add_argument("--generate", action="store_true", help="generate values from a synthetic drive cycle")
+    parser.add_argument("--row-period", type=float, default=ROW_PERIOD, help="seconds per replayed row")
+    parser.add_argument("--latency", type=float, default=DEFAULT_LATENCY_MS, help="ECU response latency in ms")
+    parser.add_argument("--jitter", type=float, default=0.0, help="latency jitter (std. dev.) in ms")
+    parser.add_argument("--command-latency", action="append", default=[], metavar="CMD=MS",
+                        help="per-command latency override, e.g. 0902=300 or ATZ=1000")
+    parser.add_argument("--unsupported", default="", help="comma-separated hex PIDs to report as unsupported")
+    parser.add_argument("--vin", default=DEFAULT_VIN, help="VIN returned for 0902")
+    parser.add_argument("--ecus", type=int, choices=(1, 2), default=1, help="number of responding ECUs")
+    parser.add_argument("--link", help="create a symlink to the pty at this path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Entry point: builds the emulator from the options and serves it."""
+    args = parse_args(argv)
+    source = DriveCycle() if args.generate else CSVReplay(args.csv, args.row_period)
+    command_latency = {}
+    for item in args.command_latency:
+        cmd, ms = item.split("=", 1)
+        command_latency[cmd.strip().upper().replace(" ", "")] = float(ms)
+    unsupported = {int(p, 16) for p in args.unsupported.split(",") if p.strip()}
+    emulator = ELM327Emulator(source, args.latency, args.jitter, command_latency,
+                              unsupported, args.vin, args.ecus)
+    serve(emulator, args.link)
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        print("\n🛑 Emulator stopped by user.")
+        sys.exit(0)
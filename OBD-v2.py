@@ -62,6 +62,9 @@ from obd import OBD, commands
 PROTOCOL = "6"           # OBD-II protocol (e.g., "6" = ISO 15765-4 CAN)
 BAUDRATE = 38400         # Common for Bluetooth ELM327
 REFRESH_RATE = 1.0       # Time between readings (in seconds)
+READY_TIMEOUT = 15.0     # Max seconds to wait for an adapter to answer consistently
+READY_CONSECUTIVE = 2    # Consecutive good readiness probes required
+PROBE_TIMEOUT = 0.5      # Serial read timeout (in seconds) for a single probe command
 UNITS = "metric"         # Use "imperial" for °F and mph
 
 # ------------------------- Data Setup ----------------------------
@@ -175,6 +178,62 @@ def save_to_csv(data):
 
 # ------------------------- Connection Logic ----------------------
 
+def elm_command(ser, cmd, timeout=PROBE_TIMEOUT):
+    """
+    Sends a command over a raw serial link and reads the reply up to the
+    ELM327 '>' prompt, or until the timeout expires.
+    Returns the reply text without the prompt.
+    """
+    ser.reset_input_buffer()
+    ser.write(cmd + b"\r")
+    ser.flush()
+    deadline = time.monotonic() + timeout
+    reply = b""
+    while time.monotonic() < deadline and b">" not in reply:
+        reply += ser.read(ser.in_waiting or 1)
+    return reply.decode("ascii", "ignore").replace(">", "").strip()
+
+def probe_adapter_ready(port, baudrate, timeout=READY_TIMEOUT):
+    """
+    Actively polls the adapter (ATI and ATRV) until it answers consistently,
+    instead of sleeping for a fixed settle time.
+    Returns True as soon as the adapter is ready, False on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    good = 0
+    while time.monotonic() < deadline:
+        try:
+            with serial.Serial(port=port, baudrate=baudrate, timeout=PROBE_TIMEOUT) as s:
+                while time.monotonic() < deadline:
+                    ident = elm_command(s, b"ATI")
+                    volts = re.search(r"(\d+(?:\.\d+)?)\s*V", elm_command(s, b"ATRV").upper())
+                    if "ELM" in ident.upper() and volts:
+                        good += 1
+                        if good >= READY_CONSECUTIVE:
+                            return True
+                    else:
+                        good = 0
+                    time.sleep(0.1)
+        except serial.SerialException:
+            good = 0
+            time.sleep(0.2)
+    return False
+
+def wait_until_ready(connection, timeout=READY_TIMEOUT):
+    """
+    Polls a cheap PID (0100) on an open connection until it answers
+    READY_CONSECUTIVE times in a row. Returns True when the link is ready.
+    """
+    deadline = time.monotonic() + timeout
+    good = 0
+    while time.monotonic() < deadline:
+        response = connection.query(commands.PIDS_A, force=True)
+        good = 0 if response.is_null() else good + 1
+        if good >= READY_CONSECUTIVE:
+            return True
+        time.sleep(0.1)
+    return False
+
 def connect_with_retry(protocol, baudrate=38400, retries=5, delay=2, timeout=3):
     """
     Scans paired Bluetooth COM ports and attempts to connect to OBD-II.
@@ -182,9 +241,6 @@ def connect_with_retry(protocol, baudrate=38400, retries=5, delay=2, timeout=3):
     Returns:
         tuple: (OBD connection object, port name) if successful, else (None, None)
     """
-    print("🔄 Waiting before first attempt...")
-    time.sleep(5)
-
     print("🔍 Scanning for paired Bluetooth OBD-II devices...")
     available_ports = list_paired_bluetooth_ports()
 
@@ -198,15 +254,11 @@ def connect_with_retry(protocol, baudrate=38400, retries=5, delay=2, timeout=3):
 
     for port, mac in available_ports:
         print(f"\n🔍 Pre-checking {port} ({mac})...")
-        try:
-            time.sleep(2)
-            s = serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
-            time.sleep(2)
-            s.close()
-            time.sleep(10)  # Allow the device to settle
-        except Exception as e:
-            print(f"⚠️ Skipping {port}: {e}")
+        started = time.monotonic()
+        if not probe_adapter_ready(port, baudrate):
+            print(f"⚠️ Skipping {port}: no consistent ELM327 answer.")
             continue
+        print(f"🟢 {port} ready after {time.monotonic() - started:.1f}s")
 
         for attempt in range(1, retries + 1):
             print(f"🧪 Trying OBD connection on {port} (Attempt {attempt}/{retries})...")
@@ -242,8 +294,9 @@ def main():
         return
 
     print("✅ OBD-II adapter connected.")
-    print("⏳ Waiting 2 seconds to stabilize...")
-    time.sleep(2)
+    print("⏳ Waiting for the vehicle to answer consistently...")
+    if not wait_until_ready(connection):
+        print("⚠️ Vehicle did not answer consistently; continuing anyway.")
 
     try:
         while True:
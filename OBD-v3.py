@@ -12,6 +12,8 @@
 
 🔧 Features:
     - Automatically scans and connects to Bluetooth serial ports.
+    - Probes all paired ports in parallel and remembers the adapter's port
+      for the next start.
     - Queries ECU for key engine and environmental parameters.
     - Appends readings row-wise to a common CSV file in UTF-8 (Excel-safe).
     - Prints live tabular data to terminal.
@@ -45,6 +47,9 @@ from datetime import datetime
 import csv
 import re
 import os
+import json
+import queue
+import threading
 import serial
 import serial.tools.list_ports
 import pytz
@@ -55,6 +60,12 @@ from obd import OBD, commands
 PROTOCOL = "6"           # OBD-II protocol (ISO 15765-4 CAN)
 BAUDRATE = 38400         # Bluetooth ELM327 default baudrate
 REFRESH_RATE = 1.0       # Time (in seconds) between samples
+READY_TIMEOUT = 15.0     # Max seconds to wait for an adapter to answer consistently
+READY_CONSECUTIVE = 2    # Consecutive good readiness probes required
+PROBE_TIMEOUT = 0.5      # Serial read timeout (in seconds) for a single probe command
+ATZ_TIMEOUT = 2.0        # An ELM327 takes about a second to answer a reset (ATZ)
+DISCOVERY_TIMEOUT = 20.0 # Max seconds to wait for any port to answer as an ELM327
+ADAPTER_CACHE_FILE = "adapter_cache.json"  # Remembers the last working adapter port
 UNITS = "metric"         # "metric" for °C/km/h, "imperial" for °F/mph
 
 VEH_NO    = "BBJ-91"                 # Vehicle registration number
@@ -156,14 +167,129 @@ def append_row_to_csv(file_path, row):
 
 # ------------------------- Connection Logic ----------------------
 
+def elm_command(ser, cmd, timeout=PROBE_TIMEOUT):
+    """
+    Sends a command over a raw serial link and reads the reply up to the
+    ELM327 '>' prompt, or until the timeout expires.
+    Returns the reply text without the prompt.
+    """
+    ser.reset_input_buffer()
+    ser.write(cmd + b"\r")
+    ser.flush()
+    deadline = time.monotonic() + timeout
+    reply = b""
+    while time.monotonic() < deadline and b">" not in reply:
+        reply += ser.read(ser.in_waiting or 1)
+    return reply.decode("ascii", "ignore").replace(">", "").strip()
+
+def probe_adapter_ready(port, baudrate, timeout=READY_TIMEOUT):
+    """
+    Actively polls the adapter (ATI and ATRV) until it answers consistently,
+    instead of sleeping for a fixed settle time.
+    Returns True as soon as the adapter is ready, False on timeout.
+    """
+    deadline = time.monotonic() + timeout
+    good = 0
+    while time.monotonic() < deadline:
+        try:
+            with serial.Serial(port=port, baudrate=baudrate, timeout=PROBE_TIMEOUT) as s:
+                while time.monotonic() < deadline:
+                    ident = elm_command(s, b"ATI")
+                    volts = re.search(r"(\d+(?:\.\d+)?)\s*V", elm_command(s, b"ATRV").upper())
+                    if "ELM" in ident.upper() and volts:
+                        good += 1
+                        if good >= READY_CONSECUTIVE:
+                            return True
+                    else:
+                        good = 0
+                    time.sleep(0.1)
+        except serial.SerialException:
+            good = 0
+            time.sleep(0.2)
+    return False
+
+def wait_until_ready(connection, timeout=READY_TIMEOUT):
+    """
+    Polls a cheap PID (0100) on an open connection until it answers
+    READY_CONSECUTIVE times in a row. Returns True when the link is ready.
+    """
+    deadline = time.monotonic() + timeout
+    good = 0
+    while time.monotonic() < deadline:
+        response = connection.query(commands.PIDS_A, force=True)
+        good = 0 if response.is_null() else good + 1
+        if good >= READY_CONSECUTIVE:
+            return True
+        time.sleep(0.1)
+    return False
+
+def elm_handshake(port, baudrate, cancel):
+    """
+    Short ELM327 handshake on one port: reset (ATZ) and identify (ATI).
+    Gives up early when the `cancel` event is set.
+    Returns True if the device on the port is an ELM327.
+    """
+    try:
+        with serial.Serial(port=port, baudrate=baudrate, timeout=PROBE_TIMEOUT) as s:
+            if cancel.is_set():
+                return False
+            reset = elm_command(s, b"ATZ", timeout=ATZ_TIMEOUT)
+            if cancel.is_set():
+                return False
+            ident = elm_command(s, b"ATI")
+            return "ELM" in (reset + ident).upper()
+    except (serial.SerialException, OSError):
+        return False
+
+def discover_adapter(ports, baudrate, timeout=DISCOVERY_TIMEOUT):
+    """
+    Probes all candidate ports at the same time with a short ELM327
+    handshake. The first port that answers as an ELM327 wins; the other
+    probes are told to stop and are not waited for.
+    Returns the (port, MAC) tuple of the adapter, or (None, None).
+    """
+    cancel = threading.Event()
+    results = queue.Queue()
+
+    def probe(port, mac):
+        results.put((port, mac, elm_handshake(port, baudrate, cancel)))
+
+    for port, mac in ports:
+        threading.Thread(target=probe, args=(port, mac), daemon=True).start()
+
+    deadline = time.monotonic() + timeout
+    for _ in ports:
+        try:
+            port, mac, is_elm = results.get(timeout=max(0.0, deadline - time.monotonic()))
+        except queue.Empty:
+            break
+        if is_elm:
+            cancel.set()
+            return port, mac
+    cancel.set()
+    return None, None
+
+def load_adapter_cache():
+    """Returns the cached (port, MAC) of the last working adapter, or (None, None)."""
+    try:
+        with open(ADAPTER_CACHE_FILE, 'r') as f:
+            cached = json.load(f)
+        return cached.get("port"), cached.get("mac")
+    except (OSError, ValueError):
+        return None, None
+
+def save_adapter_cache(port, mac):
+    """Remembers the adapter's port and MAC for the next start."""
+    with open(ADAPTER_CACHE_FILE, 'w') as f:
+        json.dump({"port": port, "mac": mac}, f)
+
 def connect_with_retry(protocol, baudrate=38400, retries=5, delay=2, timeout=3):
     """
-    Tries to connect to all paired Bluetooth COM ports.
+    Finds the ELM327 among the paired Bluetooth COM ports and connects to it.
+    The cached adapter port is tried first; otherwise all ports are probed
+    in parallel.
     Returns a working OBD connection and its port, or None.
     """
-    print("🔄 Waiting before first attempt...")
-    time.sleep(5)
-
     print("🔍 Scanning for paired Bluetooth OBD-II devices...")
     available_ports = list_paired_bluetooth_ports()
 
@@ -175,17 +301,30 @@ def connect_with_retry(protocol, baudrate=38400, retries=5, delay=2, timeout=3):
     for port, mac in available_ports:
         print(f"  - {port} (MAC: {mac})")
 
-    for port, mac in available_ports:
+    cached = load_adapter_cache()
+
+    def candidate_ports():
+        # The cached adapter first; parallel discovery only if it fails
+        if cached in available_ports:
+            print(f"⚡ Trying cached adapter on {cached[0]} first")
+            yield cached
+        others = [p for p in available_ports if p != cached]
+        if not others:
+            return
+        print("📡 Probing all paired ports in parallel...")
+        started = time.monotonic()
+        found = discover_adapter(others, baudrate)
+        if found[0]:
+            print(f"🔎 ELM327 found on {found[0]} after {time.monotonic() - started:.1f}s")
+            yield found
+
+    for port, mac in candidate_ports():
         print(f"\n🔍 Pre-checking {port} ({mac})...")
-        try:
-            time.sleep(2)
-            s = serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
-            time.sleep(2)
-            s.close()
-            time.sleep(10)
-        except Exception as e:
-            print(f"⚠️ Skipping {port}: {e}")
+        started = time.monotonic()
+        if not probe_adapter_ready(port, baudrate):
+            print(f"⚠️ Skipping {port}: no consistent ELM327 answer.")
             continue
+        print(f"🟢 {port} ready after {time.monotonic() - started:.1f}s")
 
         for attempt in range(1, retries + 1):
             print(f"🧪 Trying OBD connection on {port} (Attempt {attempt}/{retries})...")
@@ -199,6 +338,7 @@ def connect_with_retry(protocol, baudrate=38400, retries=5, delay=2, timeout=3):
                 )
                 if connection.is_connected():
                     print(f"✅ Connected successfully on {port}")
+                    save_adapter_cache(port, mac)
                     return connection, port
                 else:
                     print(f"❌ {port} did not respond as OBD.")
@@ -224,8 +364,9 @@ def main():
         return
 
     print("✅ OBD-II adapter connected.")
-    print("⏳ Waiting 2 seconds to stabilize...")
-    time.sleep(2)
+    print("⏳ Waiting for the vehicle to answer consistently...")
+    if not wait_until_ready(connection):
+        print("⚠️ Vehicle did not answer consistently; continuing anyway.")
 
     initialize_csv(CSV_FILENAME)
 
@@ -21,144 +21,2990 @@
     - Robust, multi-threaded operations to keep the GUI responsive during
       connection, monitoring, and disconnection.
     - Saves vehicle information between sessions.
+    - Batches up to six Mode 01 PIDs into a single request per round trip.
+    - Low-latency queries: learns how many frames each request returns and
+      appends the ELM327 response-count hint, with adaptive timing enabled.
+    - Caches each vehicle's supported PIDs so unsupported sensors are never
+      polled.
+    - Fast reconnect: the negotiated protocol, baud rate and supported PIDs are cached per adapter MAC and replayed on the next
+      connection, with full auto-detection only as a fallback.
+    - Probes the adapter for readiness (ATI/ATRV and a cheap PID) instead
+      of sleeping for a fixed stabilization time.
+    - Polls each sensor at its own rate (fast engine PIDs often, slow
+      temperatures rarely) while keeping every logged row complete.
+    - Logs rows on a drift-free sample clock, so the dataset has a fixed
+      sample rate regardless of query latency.
+    - Writes the CSV from a background thread with batched flush/fsync,
+      so disk stalls never freeze the GUI.
+    - Optional numeric logging: the dataset stores plain numbers, with the
+      units in a '.schema.json' sidecar; units are only added for display.
+    - Keeps the live table bounded and pages older rows in from the CSV,
+      so long sessions stay responsive.
+    - Refreshes the GUI at a fixed frame rate, applying all new rows and log
+      lines in one batch per frame.
+    - Headless acquisition engine shared by the GUI and a command-line
+      mode (--headless --port ...) for machines without a display.
+    - Optional acquisition process (--process / --daemon): samples are
+      published to a shared-memory ring buffer, so GUI load cannot add
+      sampling jitter and the GUI can restart without dropping the vehicle
+      connection.
+    - Sensors are declared once in a registry (command, decoder, unit,
+      format, poll rate); headers, columns and the schema derive from it.
+    - Fast decode path: registered PIDs are decoded straight from the
+      reply bytes, bit-identical to python-obd but without its per-value
+      response and unit objects.
+    - Acquisition profiles: hidden columns (with 'Poll shown columns only')
+      or --sensors drop PIDs from the poll set; they are logged as null.
+    - Optional columnar storage: typed, zstd-compressed Parquet chunks
+      rolled by rows or minutes, with dictionary-encoded vehicle fields.
+    - Optional SQLite storage (WAL, batched transactions, indexed by
+      vehicle and time) with range queries and export while logging.
+    - Optional partitioned CSV layout by vehicle and date, rotated by
+      size or time, with a manifest of each part's time range and rows.
+    - Optional gzip/zstd compression of CSV datasets with periodic flush
+      points, readable up to the last flush point after a crash.
+    - Crash-safe sample journal: rows are journaled with checksums and
+      group-committed fsyncs until the dataset commits them, replayed on
+      the next start; torn records and half-written CSV lines are trimmed.
+    - Bounded status log with level filtering; the full history goes to a
+      rotating log file written off the GUI thread.
+    - Port list is shown instantly from the previous session's cache and
+      refreshed in the background; on Linux, udev hot-plug events keep it
+      current without rescanning (optional pyudev).
 
 🛠 Dependencies:
     - python-OBD
+    - dataset_codec.py (in this directory)
     - pyserial
     - pytz
+    - pyudev (optional, Linux hot-plug notifications)
+    - pyarrow (optional, Parquet storage)
+    - zstandard (optional, zstd-compressed datasets)
 """
-import tkinter as tk
-from tkinter import ttk
+try:
+    import tkinter as tk
+    from tkinter import ttk
+except ImportError:  # headless installs (e.g. an in-car box) may not ship Tk
+    tk = ttk = None
 import serial.tools.list_ports
+import argparse
+import signal
+import sys
+import subprocess
+import struct
+import math
 import threading
+import queue
+import io
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
 import csv
 import os
 import pytz
 import re
 import json
-from obd import OBD, commands
+import zlib
+import bisect
+import sqlite3
+import contextlib
+import logging
+import logging.handlers
+from collections import deque, namedtuple
+from multiprocessing import shared_memory
+from obd import OBD, OBDStatus, commands
+from obd.protocols.protocol import Message
+from dataset_codec import read_dataset_text
 
 # -------------------- Config Storage --------------------
 CONFIG_FILE = "veh_config.json"
 
 def load_config():
-    """Loads vehicle configuration from a JSON file."""
+    """
+    Loads vehicle configuration from a JSON file. An unreadable file (e.g.
+    from an older, non-atomic save that was interrupted) is ignored, so the
+    app still starts with the defaults.
+    """
     if os.path.isfile(CONFIG_FILE):
-        with open(CONFIG_FILE, 'r') as f:
-            return json.load(f)
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logging.getLogger("obd_logger").warning(f"⚠️ Could not read {CONFIG_FILE}, using defaults: {e}")
     return {"VEH_NO": "BBJ-91", "VEH_TYPE": "Chery Tiggo 8 Pro", "YR_MFR": "2023"}
 
-def save_config(config):
-    """Saves vehicle configuration to a JSON file."""
-    with open(CONFIG_FILE, 'w') as f:
-        json.dump(config, f)
+def save_config(config):
+    """
+    Saves vehicle configuration to a JSON file. The file is replaced
+    atomically (temporary file, fsync, rename), so a crash or another
+    process reading it never sees a half-written file.
+    """
+    tmp_path = f"{CONFIG_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(config, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, CONFIG_FILE)
+
+# -------------------- Global Settings --------------------
+config = load_config()
+TIMEZONE = "Asia/Karachi"
+CSV_FILENAME = "obd_dataset.csv"
+NUMERIC_LOGGING = True   # Store plain numbers (units in a sidecar schema) instead of "78 °C" strings
+NUMERIC_CSV_FILENAME = "obd_dataset_numeric.csv"
+STORAGE_BACKEND = "csv"  # Dataset format: "csv", "partitioned", "parquet" (needs pyarrow) or "sqlite"
+DATASET_COMPRESSION = None  # CSV datasets: None, "gzip" or "zstd" (needs zstandard), with a flush point per group commit
+COMPRESSION_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+PARTITION_DIR = "obd_dataset"    # Root of the partitioned layout (<vehicle>/<date>/part-*.csv)
+PARTITION_MAX_BYTES = 50_000_000 # Rotate a partitioned part file at this size...
+PARTITION_MAX_MINUTES = 60       # ...or after this many minutes
+PARQUET_DIR = "obd_dataset_parquet"
+SQLITE_FILENAME = "obd_dataset.sqlite"
+CHUNK_ROWS = 10000       # Roll a columnar chunk after this many rows...
+CHUNK_MINUTES = 10       # ...or after this many minutes, whichever comes first
+CHUNK_RETRY_DELAY = 30.0 # Seconds before retrying a chunk that failed to write (its rows are kept)
+UNITS = "metric"
+REFRESH_RATE = 2.0       # Sample period of logged rows (and default sensor poll period)
+BAUDRATE = 38400
+BATCH_QUERIES = True     # Pack several Mode 01 PIDs into one request
+PID_BATCH_SIZE = 6       # Max PIDs per Mode 01 request (ELM327/CAN limit)
+BATCH_FALLBACK_AFTER = 3 # Silent multi-PID requests in a row (answered one by one) before batching is switched off
+BATCH_RETRY_INTERVAL = 60.0  # Seconds after a fallback before multi-PID requests are tried again
+LOW_LATENCY_QUERIES = True  # Append learned response counts so the ELM327 returns early
+ADAPTIVE_TIMING = 1      # ELM327 adaptive timing mode sent as ATAT<n> (0 = off, 2 = aggressive)
+RELEARN_INTERVAL = 100   # Re-check a request's response count every N uses
+FAST_DECODE = True       # Decode registered PIDs straight from the reply bytes (False = via python-obd)
+READY_TIMEOUT = 10.0     # Max seconds to wait for the link to answer consistently
+READY_CONSECUTIVE = 2    # Consecutive good readiness probes required
+READY_POLL_INTERVAL = 0.1  # Seconds between readiness probes
+CSV_FLUSH_ROWS = 20      # Flush and fsync the CSV (commit, for SQLite) after this many rows...
+CSV_FLUSH_INTERVAL = 5.0 # ...or after this many seconds, whichever comes first
+WRITE_RETRY_DELAY = 10.0 # Seconds before retrying a dataset or journal write that failed (its rows are kept)
+JOURNAL_ENABLED = True   # Journal rows until the dataset commits them, and replay them after a crash
+JOURNAL_PATH = "obd_samples.journal"  # Segment files are <path>.000001, <path>.000002, ...
+JOURNAL_SYNC_ROWS = 10   # Fsync the journal after this many rows...
+JOURNAL_SYNC_INTERVAL = 4.0  # ...or after this many seconds (two rows at the default REFRESH_RATE)
+MAX_TABLE_ROWS = 500     # Rows kept in the live table; older rows are paged in from the CSV
+INDEX_STRIDE = 256       # Rows between entries of the CSV offset index used for paging
+PAGE_READY_TIMEOUT = 2.0 # Max seconds paging waits for a freshly started dataset writer to open its file
+GUI_FPS = 15             # GUI refresh rate; rows and log lines are applied once per frame
+LOG_LEVEL = logging.INFO # Minimum level shown in the status log (DEBUG shows per-cycle messages)
+LOG_MAX_LINES = 500      # Lines kept in the status log; older lines are trimmed
+LOG_FILE = "obd_logger.log"
+LOG_FILE_MAX_BYTES = 1_000_000
+LOG_FILE_BACKUPS = 3
+RECONNECT_DELAY = 5.0    # Headless mode: seconds to wait before reconnecting after a failure
+STOP_TIMEOUT = 6.0       # Max seconds close() waits for an in-flight query (queries time out after 5 s)
+ACQUISITION_PROCESS = False  # GUI: run acquisition in a separate daemon process (see --process)
+SHM_NAME = "obd_logger"  # Prefix of the shared memory blocks the daemon publishes to
+ROW_RING_SLOTS = 4096    # Sample rows kept in shared memory for GUI processes
+EVENT_RING_SLOTS = 512   # Log/status events kept in shared memory
+EVENT_SLOT_BYTES = 512   # Max size of one encoded event
+DAEMON_START_TIMEOUT = 10.0  # Seconds the GUI waits for a launched daemon to appear
+
+logger = logging.getLogger("obd_logger")
+
+# -------------------- Sensor Registry --------------------
+def get_raw_value(response):
+    """
+    Extracts the plain numeric value from an OBD response object.
+
+    Args:
+        response: An OBD response object from the python-obd library.
+
+    Returns:
+        The value as a number in the sensor's metric unit, or None if the
+        vehicle returned no data.
+    """
+    if response is None or response.is_null() or response.value is None:
+        return None
+    return response.value.magnitude
+
+def decode_with_obd(cmd, data):
+    """
+    Decodes a Mode 01 reply through python-obd's own decoder (OBDResponse
+    and pint Quantity). Used for sensors without a fast decoder.
+
+    Args:
+        cmd: The python-obd command the data answers.
+        data: The data bytes that followed the PID in the reply.
+
+    Returns:
+        The value as a number, or None.
+    """
+    msg = Message([])
+    msg.ecu = cmd.ecu
+    msg.data = bytearray([0x41, cmd.pid]) + data
+    return get_raw_value(cmd([msg]))
+
+# Fast decoders: data bytes after the PID -> plain number, with no response
+# or unit objects. Each repeats python-obd's arithmetic for that PID step
+# by step (same operations, same int/float types), so the values are
+# bit-identical to decode_with_obd.
+def decode_temp(d):
+    """obd.decoders.temp: A - 40 °C"""
+    return d[0] - 40
+
+def decode_percent(d):
+    """obd.decoders.percent: A * 100 / 255 %"""
+    return d[0] * 100.0 / 255.0
+
+def decode_rpm(d):
+    """obd.decoders.uas(0x07): (256A + B) * 0.25 rpm"""
+    return ((d[0] << 8) | d[1]) * 0.25 + 0.0
+
+def decode_speed(d):
+    """obd.decoders.uas(0x09): A * 1 km/h"""
+    return d[0] * 1 + 0.0
+
+def decode_fuel_pressure(d):
+    """obd.decoders.fuel_pressure: A * 3 kPa"""
+    return d[0] * 3
+
+# One entry per logged sensor. To add a sensor, add a line here; the header
+# row, table columns, dataset schema, poll rates and formatting all follow.
+#   name:    column name in the GUI and dataset
+#   command: python-obd command that fetches it
+#   decoder: fast decoder for the reply's data bytes (None = use python-obd)
+#   unit:    unit of the decoded value, recorded in the dataset schema
+#   fmt:     display format of the value
+#   rate:    target poll rate in Hz, capped at the sample rate (None = once per sample, see REFRESH_RATE)
+Sensor = namedtuple("Sensor", "name command decoder unit fmt rate")
+
+SENSORS = (
+    Sensor("Coolant Temp",  commands.COOLANT_TEMP,     decode_temp,          "°C",   "{:.0f} °C",    0.1),
+    Sensor("Oil Temp",      commands.OIL_TEMP,         decode_temp,          "°C",   "{:.0f} °C",    0.1),
+    Sensor("Engine RPM",    commands.RPM,              decode_rpm,           "rpm",  "{:.1f}",       10.0),
+    Sensor("Throttle Pos",  commands.THROTTLE_POS,     decode_percent,       "%",    "{:.1f} %",     10.0),
+    Sensor("Engine Load",   commands.ENGINE_LOAD,      decode_percent,       "%",    "{:.1f} %",     5.0),
+    Sensor("Speed",         commands.SPEED,            decode_speed,         "km/h", "{:.1f} km/h",  10.0),
+    Sensor("Fuel Level",    commands.FUEL_LEVEL,       decode_percent,       "%",    "{:.1f} %",     0.1),
+    Sensor("Fuel Pressure", commands.FUEL_PRESSURE,    decode_fuel_pressure, "kPa",  "{:.1f} kPa",   1.0),
+    Sensor("Intake Temp",   commands.INTAKE_TEMP,      decode_temp,          "°C",   "{:.0f} °C",    0.1),
+    Sensor("Ambient Temp",  commands.AMBIANT_AIR_TEMP, decode_temp,          "°C",   "{:.0f} °C",    0.1),
+)
+
+def decode_sensor(sensor, data):
+    """
+    Decodes a sensor's reply data, using its fast decoder when available.
+
+    Returns:
+        The value as a number, or None if there was no reply.
+    """
+    if data is None:
+        return None
+    if FAST_DECODE and sensor.decoder is not None:
+        return sensor.decoder(data)
+    return decode_with_obd(sensor.command, data)
+
+# -------------------- Headers --------------------
+# Lookup tables generated once from the registry
+headers = ["Timestamp"] + [s.name for s in SENSORS]
+VEHICLE_FIELDS = ["Vehicle No", "Vehicle Type", "Year"]
+DATASET_COLUMNS = headers[:1] + VEHICLE_FIELDS + headers[1:]  # Column order of every dataset row
+SENSOR_BY_NAME = {s.name: s for s in SENSORS}
+SENSOR_COMMANDS = {s.name: s.command for s in SENSORS}
+POLL_RATES = {s.name: s.rate for s in SENSORS if s.rate}
+
+# -------------------- Utility Functions --------------------
+def setup_file_logging(file_path):
+    """
+    Sends the full log history (all levels) to a rotating log file. Records
+    are handed over through a queue and written by a listener thread, so
+    logging never blocks the caller on disk I/O.
+
+    Args:
+        file_path: The path to the log file.
+
+    Returns:
+        The started QueueListener; call its stop() method on shutdown.
+    """
+    log_queue = queue.Queue()
+    file_handler = logging.handlers.RotatingFileHandler(
+        file_path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUPS, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s: %(message)s"))
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    return listener
+
+def extract_mac_from_hwid(hwid: str) -> str:
+    """
+    Extracts a MAC address from a device's hardware ID string.
+
+    Args:
+        hwid: The hardware ID string provided by pyserial.
+
+    Returns:
+        A formatted MAC address string or a zero-MAC if not found.
+    """
+    match = re.search(r'&([0-9A-F]{12})', hwid.upper())
+    if match:
+        mac_raw = match.group(1)
+        return ":".join(mac_raw[i:i+2] for i in range(0, 12, 2))
+    return "00:00:00:00:00:00"
+
+def list_paired_bluetooth_ports():
+    """
+    Filters for COM ports associated with a paired Bluetooth device by
+    checking for a valid (non-zero) MAC address in the hardware ID.
+
+    Returns:
+        A list of tuples, where each tuple contains the port name and its
+        associated MAC address, e.g., [('COM4', '00:1D:A5:08:49')].
+    """
+    all_ports = serial.tools.list_ports.comports()
+    paired_ports = []
+    for port in all_ports:
+        entry = paired_port_entry(port)
+        if entry:
+            paired_ports.append(entry)
+    return paired_ports
+
+def paired_port_entry(port):
+    """
+    Checks a single pyserial port for a paired Bluetooth device. On
+    Windows these are "Bluetooth" COM ports with the MAC in the hardware
+    ID; on Linux they are bound rfcomm ttys (/dev/rfcomm*), which pyserial
+    reports without a description.
+
+    Args:
+        port: A ListPortInfo object from pyserial.
+
+    Returns:
+        A (port name, MAC address) tuple, or None if the port does not
+        belong to a paired Bluetooth device.
+    """
+    if re.fullmatch(r'/dev/rfcomm\d+', port.device):
+        mac = rfcomm_mac(port.device)
+        return (port.device, mac) if mac else None
+    if "Bluetooth" in port.description:
+        mac = extract_mac_from_hwid(port.hwid)
+        if mac != "00:00:00:00:00:00":
+            return (port.device, mac)
+    return None
+
+def rfcomm_mac(device):
+    """
+    Looks up the remote MAC address an rfcomm tty is bound to, from sysfs
+    or, failing that, from the `rfcomm` tool (BlueZ).
+
+    Args:
+        device: The device node, e.g. "/dev/rfcomm0".
+
+    Returns:
+        The MAC address in upper case, or None if it cannot be determined.
+    """
+    name = os.path.basename(device)
+    try:
+        with open(f"/sys/class/tty/{name}/address", encoding='ascii') as f:
+            text = f.read()
+    except OSError:
+        try:
+            text = subprocess.run(["rfcomm", "show", name], capture_output=True,
+                                  text=True, timeout=2).stdout
+        except (OSError, subprocess.SubprocessError):
+            return None
+    match = re.search(r'([0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5})', text)
+    if match and match.group(1) != "00:00:00:00:00:00":
+        return match.group(1).upper()
+    return None
+
+def port_mac(port):
+    """
+    Finds the MAC address of the paired adapter on a serial port, for runs
+    without a port list (headless mode): from the GUI's port cache if it
+    knows the port, otherwise from the port itself (see paired_port_entry).
+
+    Args:
+        port: The serial port name, e.g. "COM4" or "/dev/rfcomm0".
+
+    Returns:
+        The MAC address, or None if the port is not a paired Bluetooth port.
+    """
+    mac = dict(config.get("PORT_CACHE", [])).get(port)
+    if mac:
+        return mac
+    for info in serial.tools.list_ports.comports():
+        if info.device == port:
+            entry = paired_port_entry(info)
+            return entry[1] if entry else None
+    if re.fullmatch(r'/dev/rfcomm\d+', port):
+        return rfcomm_mac(port)
+    return None
+
+def ecu_signature(connection, response):
+    """
+    Builds a short string identifying which ECUs answered a PID query and
+    what they support, used to detect that the adapter is now talking to a
+    different vehicle. The protocol and ECU IDs alone are the same for most
+    single-ECU CAN cars, so the 0100 support bitmaps are included.
+
+    Args:
+        connection: An open OBD connection.
+        response: The OBD response to the "0100" (PIDS_A) query.
+
+    Returns:
+        A string such as "6:0,1:BE3FA813,98180001" (protocol ID, responding
+        ECU IDs and their 0100 bitmaps).
+    """
+    tx_ids = sorted({m.tx_id for m in response.messages if m.tx_id is not None})
+    bitmaps = sorted(bytes(m.data[2:6]).hex().upper() for m in response.messages if len(m.data) >= 6)
+    return f"{connection.protocol_id()}:{','.join(format(t, 'X') for t in tx_ids)}:{','.join(bitmaps)}"
+
+def read_vin(connection):
+    """
+    Reads the Vehicle Identification Number (Mode 09 PID 02).
+
+    Returns:
+        The VIN string, or None if the vehicle does not report one.
+    """
+    response = connection.query(commands.VIN, force=True)
+    if response.is_null() or not response.value:
+        return None
+    return response.value.decode('ascii', 'ignore').strip() or None
+
+def bitmap_pids(getter, response):
+    """
+    Returns the PIDs marked as supported in a PID support bitmap response.
+
+    Args:
+        getter: The bitmap command (PIDS_A, PIDS_B or PIDS_C).
+        response: Its OBD response.
+    """
+    return {getter.pid + i + 1 for i, bit in enumerate(response.value) if bit}
+
+def discover_supported_pids(connection, vehicle_key, profile=None):
+    """
+    Returns the set of supported Mode 01 PIDs for the connected vehicle.
+
+    The 0100/0120/0140 support bitmaps are read once per vehicle and cached
+    in the config file under the vehicle's VIN (or vehicle number when no
+    VIN is available). The cache entry is reused only while the same ECUs
+    answer the 0100 query; otherwise it is rebuilt.
+
+    Args:
+        connection: An open OBD connection.
+        vehicle_key: Fallback cache key used when the VIN cannot be read.
+        profile: Optional adapter profile (see save_adapter_profile). Its
+            PIDs are used directly if its ECU signature (which includes the
+            0100 bitmaps) still matches; the profile is keyed by adapter, so
+            it may have been built for another car.
+
+    Returns:
+        A tuple (pids, signature): the set of integer PIDs and the ECU
+        signature, or (None, None) if the bitmaps could not be read.
+    """
+    first = connection.query(commands.PIDS_A, force=True)
+    if first.is_null():
+        return None, None
+    signature = ecu_signature(connection, first)
+    if profile and profile.get("ecu") == signature:
+        return {int(pid, 16) for pid in profile["pids"]}, signature
+    key = read_vin(connection) or vehicle_key
+
+    cache = config.setdefault("SUPPORTED_PIDS", {})
+    entry = cache.get(key)
+    if entry and entry.get("ecu") == signature:
+        return {int(pid, 16) for pid in entry["pids"]}, signature
+
+    supported = set()
+    response = first
+    for getter in (commands.PIDS_A, commands.PIDS_B, commands.PIDS_C):
+        if getter is not commands.PIDS_A:
+            # The last bit of the previous bitmap says whether this one exists
+            if getter.pid not in supported:
+                break
+            response = connection.query(getter, force=True)
+            if response.is_null():
+                break
+        supported |= bitmap_pids(getter, response)
+
+    cache[key] = {"ecu": signature, "pids": [format(pid, '02X') for pid in sorted(supported)]}
+    save_config(config)
+    return supported, signature
+
+def save_adapter_profile(mac, connection, baudrate, signature, supported):
+    """
+    Stores the negotiated connection parameters of an adapter, keyed by its
+    MAC address, so the next connection can skip auto-detection.
+
+    Args:
+        mac: The adapter's MAC address.
+        connection: The open OBD connection.
+        baudrate: The baud rate the connection was opened with.
+        signature: The ECU signature (see ecu_signature).
+        supported: The set of supported Mode 01 PIDs, or None.
+    """
+    profiles = config.setdefault("ADAPTER_PROFILES", {})
+    profiles[mac] = {
+        "protocol": connection.protocol_id(),
+        "baudrate": baudrate,
+        "ecu": signature,
+        "pids": [format(pid, '02X') for pid in sorted(supported or ())],
+    }
+    save_config(config)
+
+class ProfiledOBD(OBD):
+    """
+    An OBD connection opened from a cached adapter profile: the protocol and
+    baud rate are set directly (no ATSP0 search, no baud detection, no
+    voltage check), and the supported-command list is taken from the
+    profile instead of being re-read from the car.
+    """
+    def __init__(self, portstr, profile, timeout):
+        """
+        Args:
+            portstr: The serial port of the adapter.
+            profile: The adapter profile from save_adapter_profile.
+            timeout: The query timeout in seconds.
+        """
+        self.profile = profile
+        super().__init__(portstr=portstr, baudrate=profile["baudrate"], protocol=profile["protocol"],
+                         fast=False, timeout=timeout, check_voltage=False)
+
+    # Overrides the name-mangled OBD.__load_commands, which the base
+    # constructor calls to query every PID bitmap from the car.
+    def _OBD__load_commands(self):
+        if self.status() != OBDStatus.CAR_CONNECTED:
+            return
+        for pid in self.profile.get("pids", ()):
+            pid = int(pid, 16)
+            if commands.has_pid(1, pid):
+                self.supported_commands.add(commands[1][pid])
+
+def format_value(sensor, value):
+    """
+    Formats a raw sensor value into a human-readable string using the
+    sensor's display format from the registry.
+
+    Args:
+        sensor: The Sensor entry the value belongs to.
+        value: The raw numeric value, or None if there was no data.
+
+    Returns:
+        A formatted string for display (e.g., "93 °C", "758.5", "13.7 %").
+    """
+    if value is None:
+        return "N/A"
+    return sensor.fmt.format(value)
+
+class ResponseCountCache:
+    """
+    Learns how many frames the ECUs send back for each request.
+
+    Without a hint, the ELM327 keeps listening for its full response timeout
+    after the last frame in case another ECU replies. Once the frame count of
+    a request is known, it is appended as a single hex digit (e.g. "010C0D1")
+    and the adapter returns as soon as that many frames have arrived. Every
+    RELEARN_INTERVAL uses the request is sent without the hint again, so an
+    ECU that starts answering later is not cut off for long.
+    """
+    def __init__(self, relearn_every=RELEARN_INTERVAL):
+        """
+        Args:
+            relearn_every: Number of uses between unhinted re-checks.
+        """
+        self.relearn_every = relearn_every
+        self.counts = {}
+        self.uses = {}
+
+    def request(self, base):
+        """
+        Returns the command to send for a request, with the hint appended
+        when the response count is known and no re-check is due.
+        """
+        uses = self.uses.get(base, 0)
+        self.uses[base] = uses + 1
+        count = self.counts.get(base)
+        if count is None or uses % self.relearn_every == 0:
+            return base
+        return base + format(count, 'X').encode()
+
+    def learn(self, base, sent, frame_count):
+        """
+        Records the number of frames returned for an unhinted request.
+
+        Args:
+            base: The request without a hint.
+            sent: The command that was actually sent.
+            frame_count: The number of frames in the reply.
+        """
+        if sent != base:
+            return
+        if 0 < frame_count <= 0xF:
+            self.counts[base] = frame_count
+        else:
+            self.counts.pop(base, None)
+
+def enable_adaptive_timing(connection, mode=ADAPTIVE_TIMING):
+    """
+    Sets the ELM327 adaptive timing mode (ATAT0/1/2), which shortens the
+    wait for further responses based on measured ECU response times.
+
+    Returns:
+        True if the adapter acknowledged the command.
+    """
+    reply = connection.interface.send_and_parse(b"ATAT" + str(mode).encode()) or []
+    return "OK" in "\n".join(m.raw() for m in reply)
+
+def probe_once(connection):
+    """
+    Runs one readiness probe: the adapter must identify itself (ATI),
+    report a plausible battery voltage (ATRV), and the ECU must answer a
+    cheap PID request (0100).
+
+    Returns:
+        True if all three answered.
+    """
+    def at(cmd):
+        reply = connection.interface.send_and_parse(cmd) or []
+        return "\n".join(m.raw() for m in reply)
+
+    if "ELM" not in at(b"ATI").upper():
+        return False
+    match = re.search(r"(\d+(?:\.\d+)?)\s*V", at(b"ATRV").upper())
+    if not match or float(match.group(1)) < 6:
+        return False
+    return not connection.query(commands.PIDS_A, force=True).is_null()
+
+def wait_until_ready(connection, timeout=READY_TIMEOUT, required=READY_CONSECUTIVE):
+    """
+    Polls the link until it answers `required` readiness probes in a row,
+    instead of sleeping for a fixed stabilization time.
+
+    Args:
+        connection: An open OBD connection.
+        timeout: Maximum seconds to wait.
+        required: Number of consecutive good probes needed.
+
+    Returns:
+        True as soon as the link is ready, False if the timeout expired.
+    """
+    deadline = time.monotonic() + timeout
+    good = 0
+    while time.monotonic() < deadline:
+        if not connection.is_connected():
+            return False
+        good = good + 1 if probe_once(connection) else 0
+        if good >= required:
+            return True
+        time.sleep(READY_POLL_INTERVAL)
+    return False
+
+def query_batch(connection, cmds, response_counts=None):
+    """
+    Queries several Mode 01 PIDs with a single request (e.g. "010C0D05")
+    and splits the multi-PID reply back into the data of each command.
+
+    Args:
+        connection: An open OBD connection.
+        cmds: Up to PID_BATCH_SIZE Mode 01 commands.
+        response_counts: Optional ResponseCountCache; when given, learned
+            response-count hints are appended to the request.
+
+    Returns:
+        A dict mapping each answered command to the data bytes that followed
+        its PID (cmd.bytes - 2 of them), from the first ECU the command
+        accepts. Decode them with decode_sensor(). PIDs the ECU did not
+        answer are simply missing from the dict.
+    """
+    by_pid = {cmd.pid: cmd for cmd in cmds}
+    request = b"01" + b"".join(cmd.command[2:] for cmd in cmds)
+    sent = request
+    if response_counts is not None:
+        sent = response_counts.request(request)
+    messages = connection.interface.send_and_parse(sent) or []
+    if response_counts is not None:
+        response_counts.learn(request, sent, sum(len(m.frames) for m in messages if m.data))
+
+    replies = {}
+    for msg in messages:
+        data = msg.data
+        if len(data) < 2 or data[0] != 0x41:
+            continue
+        # Reply layout: 41 <pid> <data...> <pid> <data...> ...
+        i = 1
+        while i < len(data):
+            cmd = by_pid.get(data[i])
+            if cmd is None:
+                break
+            size = cmd.bytes - 2
+            chunk = data[i + 1:i + 1 + size]
+            if len(chunk) < size:
+                break
+            if cmd not in replies and msg.ecu & cmd.ecu:
+                replies[cmd] = chunk
+            i += 1 + size
+    return replies
+
+
+class PollScheduler:
+    """
+    Decides which sensors to poll in each bus time slot. Every sensor has a
+    target rate; each slot is filled with the sensors that are most overdue
+    relative to their own poll interval.
+    """
+    def __init__(self, rates, default_rate):
+        """
+        Args:
+            rates: A dict mapping sensor names to poll rates in Hz.
+            default_rate: Poll rate used for sensors missing from `rates`.
+        """
+        self.rates = rates
+        self.default_rate = default_rate
+        self.last_polled = {}
+
+    def interval(self, name):
+        """Returns the poll interval of a sensor, in seconds."""
+        return 1.0 / self.rates.get(name, self.default_rate)
+
+    def overdue(self, name, now):
+        """Returns how many poll intervals have passed since the last poll."""
+        last = self.last_polled.get(name)
+        if last is None:
+            return float('inf')
+        return (now - last) / self.interval(name)
+
+    def next_slot(self, names, now, size):
+        """
+        Picks the sensors to poll in the next slot.
+
+        Args:
+            names: The sensors eligible for polling.
+            now: The current monotonic time.
+            size: The maximum number of sensors per slot.
+
+        Returns:
+            Up to `size` sensor names that are due, most overdue first.
+        """
+        due = [(self.overdue(name, now), name) for name in names]
+        # Small tolerance so a sensor woken at exactly its due time counts as due
+        due = [item for item in due if item[0] >= 1.0 - 1e-6]
+        due.sort(key=lambda item: item[0], reverse=True)
+        return [name for _, name in due[:size]]
+
+    def next_due_time(self, names):
+        """Returns the monotonic time at which the next sensor becomes due."""
+        times = [self.last_polled.get(name, 0.0) + self.interval(name) for name in names]
+        return min(times) if times else time.monotonic() + 1.0 / self.default_rate
+
+    def mark_polled(self, names, now):
+        """Records that the given sensors were polled at `now`."""
+        for name in names:
+            self.last_polled[name] = now
+
+
+class SampleClock:
+    """
+    A sampling clock driven by absolute deadlines on the monotonic clock.
+
+    Deadlines are computed as start + n * period, so query latency never
+    accumulates into drift. When a sample closes late, the overrun is
+    recorded, and any slots that were missed entirely are skipped instead
+    of being emitted back-to-back.
+
+    Timestamps follow the wall clock: the monotonic clock stops while the
+    machine is suspended, and NTP slowly moves the wall clock away from it.
+    Once the two disagree by more than a period, the clock is re-anchored
+    to wall time, and the slots slept through are counted as missed.
+    """
+    def __init__(self, period):
+        """
+        Args:
+            period: The sample period in seconds.
+        """
+        self.period = period
+        self.start = time.monotonic()
+        self.wall_start = datetime.now(pytz.timezone(TIMEZONE))
+        self.index = 1
+        self.skipped = 0
+        self.max_overrun = 0.0
+
+    @property
+    def deadline(self):
+        """The monotonic time at which the current sample slot closes."""
+        return self.start + self.index * self.period
+
+    def remaining(self):
+        """Returns the seconds left until the current deadline."""
+        return self.deadline - time.monotonic()
+
+    def tick(self):
+        """
+        Closes the current sample slot and advances to the next deadline.
+
+        Returns:
+            A tuple (timestamp, overrun, missed) with the nominal wall-clock
+            start of the closed slot (its sensors are read from then on, so
+            this is when the row's values were sampled), how many seconds
+            the sample was late, and how many following slots were skipped
+            because of it.
+        """
+        now = time.monotonic()
+        drift = (datetime.now(self.wall_start.tzinfo) - self.wall_start).total_seconds() - (now - self.start)
+        slept = 0
+        if abs(drift) > self.period:
+            slept = max(0, int(drift // self.period))
+            self.index += slept
+            self.start -= slept * self.period
+            self.wall_start += timedelta(seconds=drift - slept * self.period)
+        overrun = max(0.0, now - self.deadline)
+        timestamp = self.wall_start + timedelta(seconds=(self.index - 1) * self.period)
+        missed = int(overrun // self.period)
+        self.index += 1 + missed
+        missed += slept
+        self.skipped += missed
+        self.max_overrun = max(self.max_overrun, overrun)
+        return timestamp, overrun, missed
+
+
+def initialize_csv(file_path):
+    """
+    Creates the CSV file and writes the header row if the file doesn't exist.
+
+    Args:
+        file_path: The path to the CSV file.
+    """
+    if not os.path.isfile(file_path):
+        with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(DATASET_COLUMNS)
+
+def write_schema(file_path):
+    """
+    Writes the '.schema.json' sidecar describing a numeric dataset: the type
+    and unit of every column. Empty cells in the dataset mean "no data".
+
+    Args:
+        file_path: The path to the numeric CSV file.
+    """
+    columns = ([{"name": DATASET_COLUMNS[0], "type": "timestamp"}]
+               + [{"name": name, "type": "string"} for name in VEHICLE_FIELDS]
+               + [{"name": s.name, "type": "float", "unit": s.unit} for s in SENSORS])
+    schema_path = os.path.splitext(file_path)[0] + ".schema.json"
+    with open(schema_path, 'w', encoding='utf-8') as f:
+        json.dump({"columns": columns}, f, ensure_ascii=False, indent=2)
+
+class GroupCommitWriter:
+    """
+    Base of the background writers. Rows are queued by write() from any
+    thread and handed to a dedicated thread, which commits them in groups:
+    after `flush_rows` rows or `flush_interval` seconds, whichever comes
+    first.
+
+    Subclasses implement _commit(rows) and may override _open(), _abort()
+    and _close(); all of them run on the writer thread. Subclasses start
+    the thread (self.thread.start()) once they are set up. After each
+    commit, report_commit() tells `on_commit` how many rows are durable.
+
+    A failed open or commit (a full disk, a file locked by another program)
+    does not stop the writer: the error is reported through `on_error` (see
+    report_error), the failed commit is undone by _abort(), and the storage
+    is reopened and the rows retried every WRITE_RETRY_DELAY seconds.
+    """
+    _STOP = object()
+    label = "dataset"  # What the writer writes, for error messages
+
+    def __init__(self, flush_rows, flush_interval):
+        """
+        Args:
+            flush_rows: Number of rows per group commit.
+            flush_interval: Maximum seconds a written row may stay uncommitted.
+        """
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.on_commit = None
+        self.on_error = None
+        self.committed = 0
+        self.pending = []               # Rows taken from the queue but not committed yet
+        self.ready = threading.Event()  # Set once the first _open() has been tried
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def write(self, row):
+        """Queues a row for writing. Safe to call from any thread."""
+        self.queue.put(row)
+
+    def close(self):
+        """Commits all queued rows and stops the writer thread."""
+        if self.thread.ident is not None:
+            self.queue.put(self._STOP)
+            self.thread.join()
+
+    def _open(self):
+        """Prepares the storage. Runs on the writer thread before any commit, and again after a failure."""
+
+    def _commit(self, rows):
+        """Makes a group of rows durable."""
+        raise NotImplementedError
+
+    def _abort(self):
+        """Undoes what a failed commit wrote, as far as possible, and releases the storage."""
+
+    def _close(self):
+        """Releases the storage after the final commit."""
+
+    def _run(self):
+        """Writer thread: drains the queue and group-commits, retrying after failures."""
+        retrying = f"open the {self.label}, retrying in {WRITE_RETRY_DELAY:.0f} s"
+        opened = self._attempt(self._open, retrying)
+        self.ready.set()
+        last_flush = retry_at = time.monotonic()
+        while True:
+            timeout = None
+            if self.pending:
+                timeout = max(0.0, max(last_flush + self.flush_interval, retry_at) - time.monotonic())
+            try:
+                row = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                row = None
+            if row is self._STOP:
+                break
+            if row is not None:
+                self.pending.append(row)
+            now = time.monotonic()
+            if self.pending and now >= retry_at and (len(self.pending) >= self.flush_rows or
+                                                     now - last_flush >= self.flush_interval):
+                opened = opened or self._attempt(self._open, retrying)
+                if opened and self._flush():
+                    last_flush = now
+                else:
+                    opened = False
+                    retry_at = now + WRITE_RETRY_DELAY
+        if self.pending:
+            opened = opened or self._attempt(self._open, f"open the {self.label}")
+            if not (opened and self._flush()):
+                opened = False
+                report_error(self, f"⛔ {len(self.pending)} row(s) could not be written to the {self.label} before closing.")
+        if opened:
+            self._attempt(self._close, f"close the {self.label}")
+
+    def _attempt(self, action, what):
+        """Runs _open() or _close(), reporting a failure. Returns True on success."""
+        try:
+            action()
+            return True
+        except Exception as e:
+            report_error(self, f"⛔ Could not {what}: {e}")
+            return False
+
+    def _flush(self):
+        """Commits the pending rows. Returns False (after _abort()) if that failed."""
+        try:
+            self._commit(list(self.pending))
+        except Exception as e:
+            report_error(self, f"⛔ Could not write {len(self.pending)} row(s) to the {self.label}, "
+                               f"retrying in {WRITE_RETRY_DELAY:.0f} s: {e}")
+            with contextlib.suppress(Exception):
+                self._abort()
+            return False
+        self._committed(len(self.pending))
+        return True
+
+    def _committed(self, count):
+        """Marks the first `count` pending rows as durable and reports it."""
+        del self.pending[:count]
+        self.committed += count
+        report_commit(self, self.committed)
+
+
+class CSVWriter(GroupCommitWriter):
+    """
+    Appends rows to the CSV file from a dedicated background thread.
+
+    Rows are handed over through a queue, the file stays open for the
+    writer's lifetime, and data is flushed and fsynced in groups: after
+    `flush_rows` rows or `flush_interval` seconds, whichever comes first.
+
+    The writer also keeps a sparse index of row offsets (one entry every
+    INDEX_STRIDE rows), so older rows can be read back on demand without
+    scanning the whole file. A half-written last line, left by a crash, is
+    trimmed when the file is opened.
+    """
+    typed = False
+
+    def __init__(self, file_path, flush_rows=CSV_FLUSH_ROWS, flush_interval=CSV_FLUSH_INTERVAL):
+        """
+        Args:
+            file_path: The path to the CSV file.
+            flush_rows: Number of rows written between flushes.
+            flush_interval: Maximum seconds a written row may stay unflushed.
+        """
+        super().__init__(flush_rows, flush_interval)
+        self.file_path = file_path
+        self.index = []
+        self.base_rows = None
+        self.flushed_rows = 0
+        self.end = 0  # File size after the last commit
+        self.f = None
+        self.thread.start()
+
+    def read_rows(self, first, count):
+        """
+        Reads rows back from the file. Only rows that have been flushed to
+        disk are visible, and none while the file cannot be opened. Safe to
+        call from any thread.
+
+        Args:
+            first: Index of the first data row to read (0 = oldest row).
+            count: Maximum number of rows to read.
+
+        Returns:
+            A list of rows (lists of strings), oldest first.
+        """
+        if not self.ready.wait(PAGE_READY_TIMEOUT) or self.base_rows is None:
+            return []
+        first = max(0, first)
+        count = min(count, self.flushed_rows - first)
+        if count <= 0:
+            return []
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.index[first // INDEX_STRIDE])
+            for _ in range(first % INDEX_STRIDE):
+                f.readline()
+            lines = [f.readline().decode('utf-8') for _ in range(count)]
+        return list(csv.reader(lines))
+
+    def _build_index(self, f):
+        """Indexes the rows already present in the file before this session."""
+        f.seek(0)
+        f.readline()  # header
+        rows = 0
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line:
+                break
+            if not line.endswith(b"\n"):
+                logger.warning(f"⚠️ Trimmed a half-written row ({len(line)} bytes) from the end of {self.file_path}.")
+                f.truncate(offset)
+                break
+            if rows % INDEX_STRIDE == 0:
+                self.index.append(offset)
+            rows += 1
+        return rows
+
+    def _open(self):
+        """
+        Opens the file and indexes the rows already in it. When reopened
+        after a failed commit, trims whatever that commit wrote instead.
+        """
+        initialize_csv(self.file_path)
+        self.f = open(self.file_path, 'r+b')
+        if self.base_rows is None:
+            self.base_rows = self.flushed_rows = self._build_index(self.f)
+        elif self.f.seek(0, os.SEEK_END) > self.end:
+            self.f.truncate(self.end)
+        self.end = self.f.seek(0, os.SEEK_END)
+
+    def _commit(self, rows):
+        """Appends the rows, indexing their offsets, and fsyncs the file."""
+        for i, row in enumerate(rows, self.flushed_rows):
+            if i % INDEX_STRIDE == 0:
+                self.index.append(self.f.tell())
+            self.f.write(csv_row_bytes(row))
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.flushed_rows += len(rows)
+        self.end = self.f.tell()
+
+    def _abort(self):
+        """Drops the failed commit's rows from the index and closes the file."""
+        del self.index[(self.flushed_rows + INDEX_STRIDE - 1) // INDEX_STRIDE:]
+        with contextlib.suppress(OSError):
+            self.f.close()
+
+    def _close(self):
+        """Closes the file."""
+        self.f.close()
+
+
+class ColumnarWriter:
+    """
+    Writes the dataset as typed, compressed columnar chunks (Parquet, via
+    the optional pyarrow package) from a background thread.
+
+    Rows are collected in memory and written as one Parquet file per chunk,
+    rolled after `chunk_rows` rows or `chunk_minutes` minutes, whichever
+    comes first. Timestamps are stored as real timestamps and sensors as
+    float64. The vehicle fields are dictionary-encoded, so they cost a few
+    bytes per chunk instead of repeating on every row. Chunks are zstd
+    compressed and appear atomically (written to a hidden temporary name
+    first, which Parquet readers skip).
+
+    Rows that cannot be typed (e.g. unit-suffixed values replayed from a
+    session logged with NUMERIC_LOGGING off) are not held back: they are
+    appended as they are to '_rejected.csv' in the same directory, which
+    Parquet readers skip as well.
+
+    Reading one signal over many sessions touches only that column:
+        pyarrow.parquet.read_table(PARQUET_DIR, columns=["Timestamp", "Engine RPM"])
+    """
+    typed = True
+    _STOP = object()
+    REJECTED_FILE = "_rejected.csv"
+
+    def __init__(self, directory, chunk_rows=CHUNK_ROWS, chunk_minutes=CHUNK_MINUTES):
+        """
+        Args:
+            directory: The directory the chunk files are written to.
+            chunk_rows: Maximum rows per chunk.
+            chunk_minutes: Maximum minutes a chunk stays open.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        import pyarrow
+        import pyarrow.parquet
+        self.pa = pyarrow
+        self.pq = pyarrow.parquet
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        self.chunk_seconds = chunk_minutes * 60
+        self.schema = pyarrow.schema(
+            [pyarrow.field(DATASET_COLUMNS[0], pyarrow.timestamp("us", tz=TIMEZONE))]
+            + [pyarrow.field(name, pyarrow.dictionary(pyarrow.int32(), pyarrow.string()))
+               for name in VEHICLE_FIELDS]
+            + [pyarrow.field(s.name, pyarrow.float64()) for s in SENSORS],
+            metadata={s.name: s.unit for s in SENSORS})
+        os.makedirs(directory, exist_ok=True)
+        for name in os.listdir(directory):
+            if name.startswith(".chunk-") and name.endswith(".tmp"):  # left by a crash mid-write
+                with contextlib.suppress(OSError):
+                    os.remove(os.path.join(directory, name))
+        self.on_commit = None
+        self.on_error = None
+        self.rejected = 0
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def write(self, row):
+        """Queues a row for writing. Safe to call from any thread."""
+        self.queue.put(row)
+
+    def close(self):
+        """Writes all queued rows as a final chunk and stops the thread."""
+        self.queue.put(self._STOP)
+        self.thread.join()
+
+    def _convert(self, row):
+        """
+        Converts a dataset row to typed values: a datetime, the vehicle fields
+        as strings and the sensor values as floats (None for no data).
+
+        Raises:
+            ValueError, TypeError: If the row does not fit the schema.
+        """
+        if len(row) != len(DATASET_COLUMNS):
+            raise ValueError(f"{len(row)} values instead of {len(DATASET_COLUMNS)}")
+        vehicle_end = 1 + len(VEHICLE_FIELDS)
+        return ([datetime.fromisoformat(row[0])] + [str(v) for v in row[1:vehicle_end]]
+                + [None if v is None or v == "" else float(v) for v in row[vehicle_end:]])
+
+    def _reject(self, row, error):
+        """Appends a row that cannot be typed to the rejected-rows CSV."""
+        path = os.path.join(self.directory, self.REJECTED_FILE)
+        if not self.rejected:
+            report_error(self, f"⚠️ A dataset row does not fit the Parquet schema ({error}); "
+                               f"such rows go to {path} instead.")
+        self.rejected += 1
+        try:
+            initialize_csv(path)
+            with open(path, 'ab') as f:
+                f.write(csv_row_bytes(row))
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            report_error(self, f"⛔ Could not save a rejected row to {path}, dropping it: {e}")
+
+    def _write_chunk(self, rows):
+        """Encodes typed rows column by column and writes them as one Parquet file."""
+        pa = self.pa
+        columns = list(zip(*rows))
+        vehicle_end = 1 + len(VEHICLE_FIELDS)
+        arrays = [pa.array(columns[0], type=self.schema.field(0).type)]
+        arrays += [pa.array(col, type=pa.string()).dictionary_encode() for col in columns[1:vehicle_end]]
+        arrays += [pa.array(col, type=pa.float64()) for col in columns[vehicle_end:]]
+        table = pa.Table.from_arrays(arrays, schema=self.schema)
+        name = f"chunk-{rows[0][0].strftime('%Y%m%dT%H%M%S_%f')}-{len(rows)}.parquet"
+        path = os.path.join(self.directory, name)
+        tmp_path = os.path.join(self.directory, f".{name}.tmp")
+        try:
+            self.pq.write_table(table, tmp_path, compression="zstd", use_dictionary=VEHICLE_FIELDS)
+            os.replace(tmp_path, path)
+        except Exception:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+    def _run(self):
+        """
+        Writer thread: collects rows and rolls a chunk when it is full or old.
+        A chunk that fails to write keeps its rows and is retried after
+        CHUNK_RETRY_DELAY seconds, and no commit is reported for it.
+        Rejected rows count as committed once the rows before them are.
+        """
+        rows = []
+        started = None
+        retry_at = 0.0
+        written = 0
+        held = 0  # Rows (chunk rows and rejected ones) since the last commit
+        while True:
+            timeout = None
+            if rows:
+                due = retry_at if len(rows) >= self.chunk_rows else max(started + self.chunk_seconds, retry_at)
+                timeout = max(0.0, due - time.monotonic())
+            try:
+                row = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                row = None
+            if row is self._STOP:
+                break
+            if row is not None:
+                try:
+                    typed_row = self._convert(row)
+                except (ValueError, TypeError) as e:
+                    self._reject(row, e)
+                    held += 1
+                    if not rows:
+                        written += held
+                        held = 0
+                        report_commit(self, written)
+                    continue
+                if not rows:
+                    started = time.monotonic()
+                rows.append(typed_row)
+                held += 1
+            now = time.monotonic()
+            if rows and now >= retry_at and (len(rows) >= self.chunk_rows or
+                                             now - started >= self.chunk_seconds):
+                try:
+                    self._write_chunk(rows)
+                except Exception as e:
+                    report_error(self, f"⛔ Could not write a dataset chunk of {len(rows)} rows, "
+                                       f"retrying in {CHUNK_RETRY_DELAY:.0f} s: {e}")
+                    retry_at = now + CHUNK_RETRY_DELAY
+                    continue
+                written += held
+                held = 0
+                report_commit(self, written)
+                rows = []
+        if rows:
+            try:
+                self._write_chunk(rows)
+            except Exception as e:
+                report_error(self, f"⛔ Could not write the final dataset chunk of {len(rows)} rows: {e}")
+            else:
+                report_commit(self, written + held)
+        if self.rejected:
+            report_error(self, f"⚠️ {self.rejected} row(s) did not fit the Parquet schema and were saved to "
+                               f"{os.path.join(self.directory, self.REJECTED_FILE)}.")
+
+
+class SQLiteWriter(GroupCommitWriter):
+    """
+    Stores the dataset in an SQLite database in WAL mode, written from a
+    background thread.
+
+    Rows are inserted in batched transactions: one commit after
+    `flush_rows` rows or `flush_interval` seconds, whichever comes first.
+    An index on (vehicle, timestamp) serves range queries, and because of
+    WAL, readers (the GUI's history pages, query_dataset(), exports) run on
+    their own connections while logging continues.
+    """
+    typed = True
+    VEHICLE_COLUMNS = ["vehicle_no", "vehicle_type", "year"]
+
+    def __init__(self, file_path, flush_rows=CSV_FLUSH_ROWS, flush_interval=CSV_FLUSH_INTERVAL):
+        """
+        Args:
+            file_path: The path to the database file.
+            flush_rows: Number of rows per transaction.
+            flush_interval: Maximum seconds a row may stay uncommitted.
+        """
+        super().__init__(flush_rows, flush_interval)
+        self.file_path = file_path
+        self.base_rows = None
+        self.flushed_rows = 0
+        self.db = None
+        self.insert = (f"INSERT INTO samples ({sqlite_columns()}) VALUES ("
+                       + ", ".join("?" * (len(self.VEHICLE_COLUMNS) + len(SENSORS) + 1)) + ")")
+        self.thread.start()
+
+    def read_rows(self, first, count):
+        """
+        Reads rows back in insertion order. Only committed rows are visible,
+        and none while the database cannot be opened. Safe to call from any
+        thread.
+
+        Args:
+            first: Index of the first row to read (0 = oldest row).
+            count: Maximum number of rows to read.
+
+        Returns:
+            A list of rows (timestamp, vehicle fields, sensor values), oldest first.
+        """
+        if not self.ready.wait(PAGE_READY_TIMEOUT) or self.base_rows is None:
+            return []
+        first = max(0, first)
+        count = min(count, self.flushed_rows - first)
+        if count <= 0:
+            return []
+        with sqlite_reader(self.file_path) as db:
+            return [list(r) for r in db.execute(
+                f"SELECT {sqlite_columns()} FROM samples WHERE id BETWEEN ? AND ? ORDER BY id",
+                (first + 1, first + count))]
+
+    def _open(self):
+        """Opens the database, creating the table and index on first use."""
+        self.db = sqlite3.connect(self.file_path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS samples (id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, "
+            + ", ".join(f"{c} TEXT" for c in self.VEHICLE_COLUMNS) + ", "
+            + ", ".join(f'"{s.name}" REAL' for s in SENSORS) + ")")
+        self.db.execute("CREATE INDEX IF NOT EXISTS samples_vehicle_time ON samples (vehicle_no, timestamp)")
+        self.db.commit()
+        self.flushed_rows = self.db.execute("SELECT COALESCE(MAX(id), 0) FROM samples").fetchone()[0]
+        if self.base_rows is None:
+            self.base_rows = self.flushed_rows
+
+    def _commit(self, rows):
+        """Inserts the rows in one transaction."""
+        with self.db:
+            self.db.executemany(self.insert, rows)
+        self.flushed_rows += len(rows)
+
+    def _abort(self):
+        """Closes the database; the failed transaction was rolled back."""
+        with contextlib.suppress(sqlite3.Error):
+            self.db.close()
+
+    def _close(self):
+        """Closes the database."""
+        self.db.close()
+
+
+def sqlite_columns():
+    """Returns the quoted column list of the samples table, in dataset row order."""
+    return ", ".join(["timestamp"] + SQLiteWriter.VEHICLE_COLUMNS + [f'"{s.name}"' for s in SENSORS])
+
+def sqlite_reader(file_path):
+    """Opens a read-only connection to the dataset database."""
+    db = sqlite3.connect(f"file:{file_path}?mode=ro", uri=True)
+    db.execute("PRAGMA query_only=ON")
+    return contextlib.closing(db)
+
+def query_dataset(file_path, vehicle_no, start=None, end=None):
+    """
+    Runs an indexed range query on the SQLite dataset. Safe to run while
+    the logger is writing to it.
+
+    Args:
+        file_path: The path to the database file.
+        vehicle_no: The vehicle number to select.
+        start: Optional ISO timestamp; rows at or after it.
+        end: Optional ISO timestamp; rows before it.
+
+    Returns:
+        A list of rows (timestamp, vehicle fields, sensor values), oldest first.
+    """
+    sql = f"SELECT {sqlite_columns()} FROM samples WHERE vehicle_no = ?"
+    params = [vehicle_no]
+    if start:
+        sql += " AND timestamp >= ?"
+        params.append(start)
+    if end:
+        sql += " AND timestamp < ?"
+        params.append(end)
+    with sqlite_reader(file_path) as db:
+        return [list(r) for r in db.execute(sql + " ORDER BY timestamp", params)]
+
+
+class DatasetStream:
+    """
+    An append-only dataset file, optionally gzip or zstd compressed, with
+    explicit flush points.
+
+    flush_point() pushes everything written so far through the compressor
+    with a sync/block flush, which keeps the stream open, and then fsyncs
+    the file. If the process dies, the file still decompresses up to its
+    last flush point (see dataset_codec.py). Every session appends a new
+    gzip member or zstd frame; standard tools read these as one stream.
+    Never append after a member cut short by a crash (see
+    compressed_append_path): most decoders stop at the join.
+    """
+    def __init__(self, path, compression=None):
+        """
+        Args:
+            path: The file to append to.
+            compression: None, "gzip" or "zstd".
+
+        Raises:
+            ImportError: If compression is "zstd" and zstandard is missing.
+        """
+        self.compressor = None
+        if compression == "gzip":
+            self.compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self.sync_mode, self.finish_mode = zlib.Z_SYNC_FLUSH, zlib.Z_FINISH
+        elif compression == "zstd":
+            import zstandard
+            self.compressor = zstandard.ZstdCompressor(level=3).compressobj()
+            self.sync_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+            self.finish_mode = zstandard.COMPRESSOBJ_FLUSH_FINISH
+        elif compression:
+            raise ValueError(f"Unknown compression '{compression}'")
+        self.f = open(path, 'ab')
+
+    def write(self, data):
+        """Appends bytes (buffered in the compressor until the next flush point)."""
+        if self.compressor is not None:
+            data = self.compressor.compress(data)
+        self.f.write(data)
+
+    def tell(self):
+        """Returns the file size on disk so far."""
+        return self.f.tell()
+
+    def flush_point(self):
+        """Makes everything written so far readable after a crash, and fsyncs it."""
+        if self.compressor is not None:
+            self.f.write(self.compressor.flush(self.sync_mode))
+        self.f.flush()
+        os.fsync(self.f.fileno())
+
+    def close(self):
+        """Ends the compressed stream, fsyncs and closes the file."""
+        if self.compressor is not None:
+            self.f.write(self.compressor.flush(self.finish_mode))
+        self.f.flush()
+        os.fsync(self.f.fileno())
+        self.f.close()
+
+    def abandon(self):
+        """Closes the file without ending the stream, after a failed write."""
+        with contextlib.suppress(OSError):
+            self.f.close()
+
+
+class CompressedCSVWriter(GroupCommitWriter):
+    """
+    Appends rows to a gzip- or zstd-compressed CSV from a background thread.
+
+    Works like CSVWriter, but each group commit is a flush point of the
+    compressed stream (see DatasetStream). Compressed files have no row
+    offsets, so older rows cannot be paged back into the GUI. While a
+    session is writing, a '<file>.open' marker exists next to the file; a
+    marker left behind means the session crashed (see compressed_append_path).
+    """
+    typed = False
+
+    def __init__(self, file_path, compression, flush_rows=CSV_FLUSH_ROWS, flush_interval=CSV_FLUSH_INTERVAL):
+        """
+        Args:
+            file_path: The path to the compressed CSV file.
+            compression: "gzip" or "zstd".
+            flush_rows: Number of rows written between flush points.
+            flush_interval: Maximum seconds a written row may stay unflushed.
+
+        Raises:
+            ImportError: If the compression library is missing.
+        """
+        super().__init__(flush_rows, flush_interval)
+        if compression == "zstd":
+            import zstandard  # fail here, not in the writer thread
+        self.dataset_path = file_path
+        self.file_path = compressed_append_path(file_path)
+        self.compression = compression
+        self.stream = None
+        self.end = 0  # File size at the last flush point
+        self.thread.start()
+
+    def _open(self):
+        """
+        Marks the file as open and starts this session's compressed member.
+        After a failed commit left that member torn, moves on to the next
+        numbered file.
+        """
+        if self.stream is not None:
+            self.file_path = compressed_append_path(self.dataset_path)
+        new_file = not os.path.isfile(self.file_path) or os.path.getsize(self.file_path) == 0
+        with open(self.file_path + ".open", 'wb') as f:
+            os.fsync(f.fileno())
+        self.stream = DatasetStream(self.file_path, self.compression)
+        self.end = self.stream.tell()
+        if new_file:
+            self.stream.write(csv_header_bytes())
+
+    def _commit(self, rows):
+        """Compresses the rows and adds a flush point."""
+        for row in rows:
+            self.stream.write(csv_row_bytes(row))
+        self.stream.flush_point()
+        self.end = self.stream.tell()
+
+    def _abort(self):
+        """
+        Abandons the compressed member, cut back to its last flush point; the
+        open marker stays until _open() moves on to the next file.
+        """
+        self.stream.abandon()
+        os.truncate(self.file_path, self.end)
+
+    def _close(self):
+        """Ends the compressed stream and removes the open marker."""
+        self.stream.close()
+        os.remove(self.file_path + ".open")
+
+
+def compressed_append_path(file_path):
+    """
+    Picks the compressed dataset file a new session appends to: the newest
+    of file_path and its numbered successors (obd_dataset_numeric.1.csv.gz,
+    ...). If the session writing that file crashed or failed to write (its
+    '.open' marker is still there), the next numbered file is started instead, so
+    the torn member stays at the end of its file and everything before it
+    remains readable.
+
+    Args:
+        file_path: The configured dataset path, e.g. "obd_dataset_numeric.csv.gz".
+
+    Returns:
+        The path to append to.
+    """
+    root, compressed_ext = os.path.splitext(file_path)
+    stem, ext = os.path.splitext(root)
+    number = 0
+    path = file_path
+    while os.path.isfile(f"{stem}.{number + 1}{ext}{compressed_ext}"):
+        number += 1
+        path = f"{stem}.{number}{ext}{compressed_ext}"
+    if not os.path.isfile(path + ".open"):
+        return path
+    os.remove(path + ".open")
+    new_path = f"{stem}.{number + 1}{ext}{compressed_ext}"
+    logger.warning(f"⚠️ {path} was cut short; continuing in {new_path}.")
+    return new_path
+
+def csv_header_bytes():
+    """Returns the dataset header row, encoded as initialize_csv writes it."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(DATASET_COLUMNS)
+    return buffer.getvalue().encode('utf-8-sig')
+
+def csv_row_bytes(row):
+    """Returns one dataset row encoded as a CSV line."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue().encode('utf-8')
+
+
+class PartitionedWriter(GroupCommitWriter):
+    """
+    Writes the dataset as CSV files in a directory tree partitioned by
+    vehicle number and date:
+
+        <directory>/<vehicle no>/<YYYY-MM-DD>/part-<HHMMSS_micro>.csv
+
+    A new part file is started when the vehicle or date changes, or when
+    the current file exceeds `max_bytes` or is older than `max_minutes`.
+    Part files can be gzip/zstd compressed (see DatasetStream). Writes are
+    group-committed like CSVWriter. After each commit,
+    'manifest.json' at the root is rewritten atomically. It lists every
+    part with its vehicle, date, first/last timestamp, row count and size,
+    so queries and uploads can skip irrelevant partitions without opening
+    them (see find_partitions).
+    """
+    typed = False
+
+    def __init__(self, directory, compression=None, max_bytes=PARTITION_MAX_BYTES,
+                 max_minutes=PARTITION_MAX_MINUTES, flush_rows=CSV_FLUSH_ROWS, flush_interval=CSV_FLUSH_INTERVAL):
+        """
+        Args:
+            directory: The root directory of the dataset.
+            compression: None, "gzip" or "zstd" for compressed part files.
+            max_bytes: Size at which a part file is rotated.
+            max_minutes: Age at which a part file is rotated.
+            flush_rows: Number of rows written between flushes.
+            flush_interval: Maximum seconds a written row may stay unflushed.
+        """
+        super().__init__(flush_rows, flush_interval)
+        self.directory = directory
+        self.compression = compression
+        if compression == "zstd":
+            import zstandard  # fail here, not in the writer thread
+        self.max_bytes = max_bytes
+        self.max_seconds = max_minutes * 60
+        os.makedirs(directory, exist_ok=True)
+        if NUMERIC_LOGGING:
+            write_schema(os.path.join(directory, "obd_dataset.csv"))
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.partitions = load_manifest(directory)
+        self.part = None      # DatasetStream of the current part file
+        self.entry = None     # Its manifest entry
+        self.key = None       # Its (vehicle no, date)
+        self.opened = 0.0     # Monotonic time it was started
+        self.thread.start()
+
+    def _open_part(self, row):
+        """Starts a new part file for the row's vehicle and date."""
+        vehicle = re.sub(r'[^\w.-]+', '_', row[1]) or "unknown"
+        date = row[0][:10]
+        first = datetime.fromisoformat(row[0])
+        name = f"part-{first.strftime('%H%M%S_%f')}.csv" + COMPRESSION_SUFFIXES.get(self.compression, "")
+        relative = os.path.join(vehicle, date, name)
+        path = os.path.join(self.directory, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.part = DatasetStream(path, self.compression)
+        self.part.write(csv_header_bytes())
+        self.entry = {"path": relative.replace(os.sep, "/"), "vehicle": row[1], "date": date,
+                      "start": row[0], "end": row[0], "rows": 0, "bytes": 0}
+        self.partitions.append(self.entry)
+        self.key = (row[1], date)
+        self.opened = time.monotonic()
+
+    def _save_manifest(self):
+        """Atomically rewrites manifest.json (temporary file, fsync, rename)."""
+        tmp_path = self.manifest_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"partitions": self.partitions}, f, ensure_ascii=False, indent=1)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _commit_part(self, rows):
+        """Adds a flush point to the current part, then records its rows in the manifest."""
+        self.part.flush_point()
+        previous = dict(self.entry)
+        self.entry.update(rows=self.entry["rows"] + len(rows), end=rows[-1][0], bytes=self.part.tell())
+        try:
+            self._save_manifest()
+        except OSError:
+            self.entry.update(previous)
+            raise
+
+    def _commit(self, rows):
+        """
+        Appends the rows, rotating part files as needed, and commits them.
+        Rows that went into a part closed by a rotation are committed (and
+        reported) before the next part is started.
+        """
+        start = 0
+        for i, row in enumerate(rows):
+            if self.part is not None and ((row[1], row[0][:10]) != self.key
+                                          or self.part.tell() >= self.max_bytes
+                                          or time.monotonic() - self.opened >= self.max_seconds):
+                if i > start:
+                    self._commit_part(rows[start:i])
+                    self._committed(i - start)
+                    start = i
+                self.part.close()
+                self.part = None
+            if self.part is None:
+                self._open_part(row)
+            self.part.write(csv_row_bytes(row))
+        self._commit_part(rows[start:])
+
+    def _abort(self):
+        """
+        Abandons the current part after a failed commit, cut back to its
+        last commit (or removed if it has none); the next rows start a new part.
+        """
+        if self.part is None:
+            return
+        self.part.abandon()
+        self.part = None
+        path = os.path.join(self.directory, self.entry["path"])
+        if self.entry["rows"]:
+            os.truncate(path, self.entry["bytes"])
+        else:
+            self.partitions.remove(self.entry)
+            os.remove(path)
+
+    def _close(self):
+        """Closes the current part file."""
+        if self.part is not None:
+            self.part.close()
+
+
+def load_manifest(directory):
+    """
+    Returns the partition list of a partitioned dataset (empty if there is
+    none yet). If manifest.json is missing or cannot be parsed, the list is
+    rebuilt from the part files themselves (see scan_partitions).
+    """
+    try:
+        with open(os.path.join(directory, "manifest.json"), encoding='utf-8') as f:
+            return json.load(f)["partitions"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        error = e
+    partitions = scan_partitions(directory)
+    if partitions:
+        logger.warning(f"⚠️ Rebuilt the manifest of {directory} from {len(partitions)} part file(s): {error}")
+    return partitions
+
+def scan_partitions(directory):
+    """
+    Builds the manifest entries of a partitioned dataset by reading every
+    part file (<vehicle>/<date>/part-*.csv, optionally .gz/.zst). Slow, but
+    only needed when manifest.json is lost. Parts without complete rows
+    are left out.
+
+    Args:
+        directory: The root directory of the dataset.
+
+    Returns:
+        The partition list, oldest first.
+    """
+    partitions = []
+    for root, _, names in os.walk(directory):
+        for name in names:
+            if not re.fullmatch(r'part-\d{6}_\d{6}\.csv(\.gz|\.zst)?', name):
+                continue
+            path = os.path.join(root, name)
+            try:
+                text = read_dataset_text(path)
+                size = os.path.getsize(path)
+            except (OSError, ValueError, ImportError) as e:
+                logger.warning(f"⚠️ Skipped unreadable part file {path}: {e}")
+                continue
+            rows = list(csv.reader(io.StringIO(text[:text.rfind("\n") + 1], newline='')))[1:]
+            if not rows:
+                continue
+            partitions.append({"path": os.path.relpath(path, directory).replace(os.sep, "/"),
+                               "vehicle": rows[0][1], "date": rows[0][0][:10], "start": rows[0][0],
+                               "end": rows[-1][0], "rows": len(rows), "bytes": size})
+    partitions.sort(key=lambda p: p["start"])
+    return partitions
+
+def find_partitions(directory, vehicle_no=None, start=None, end=None):
+    """
+    Selects the part files that can hold rows for a vehicle and time range,
+    using only the manifest.
+
+    Args:
+        directory: The root directory of the dataset.
+        vehicle_no: Optional vehicle number to select.
+        start: Optional ISO timestamp; parts ending before it are skipped.
+        end: Optional ISO timestamp; parts starting at or after it are skipped.
+
+    Returns:
+        The paths of the matching part files, oldest first.
+    """
+    parts = [p for p in load_manifest(directory)
+             if p["rows"] and (vehicle_no is None or p["vehicle"] == vehicle_no)
+             and (start is None or p["end"] >= start) and (end is None or p["start"] < end)]
+    parts.sort(key=lambda p: p["start"])
+    return [os.path.join(directory, p["path"]) for p in parts]
+
+
+def open_dataset(backend=STORAGE_BACKEND, compression=DATASET_COMPRESSION):
+    """
+    Opens the dataset writer for a storage backend. All writers share one
+    interface: write(row) queues [timestamp, vehicle no, vehicle type, year,
+    *sensor values] from any thread, and close() writes everything queued.
+    `typed` writers store raw numbers regardless of NUMERIC_LOGGING, and
+    writers that can page older rows back provide read_rows(). If set,
+    `on_commit(n)` is called from the writer thread whenever the first n
+    rows written since opening are durable (see report_commit).
+
+    Args:
+        backend: "csv", "partitioned", "parquet" or "sqlite".
+        compression: None, "gzip" or "zstd" for the CSV backends. Parquet
+            chunks are always zstd-compressed; SQLite is not compressed.
+
+    Raises:
+        ImportError: If an optional dependency of the backend or the
+            compression is missing.
+    """
+    if backend == "parquet":
+        return ColumnarWriter(PARQUET_DIR)
+    if backend == "sqlite":
+        return SQLiteWriter(SQLITE_FILENAME)
+    if backend == "partitioned":
+        return PartitionedWriter(PARTITION_DIR, compression)
+    file_path = NUMERIC_CSV_FILENAME if NUMERIC_LOGGING else CSV_FILENAME
+    if NUMERIC_LOGGING:
+        write_schema(file_path)
+    if compression:
+        return CompressedCSVWriter(file_path + COMPRESSION_SUFFIXES[compression], compression)
+    return CSVWriter(file_path)
+
+def report_error(writer, message):
+    """
+    Reports a dataset writer's error through its on_error callback, or to
+    the log file if it has none. Called from the writer thread.
+    """
+    if writer.on_error is None:
+        logger.error(message)
+        return
+    try:
+        writer.on_error(message)
+    except Exception as e:
+        logger.error(f"{message} (error callback failed: {e})")
+
+def report_commit(writer, committed):
+    """
+    Tells a dataset writer's on_commit callback (if any) how many of its
+    rows are durable. Called from the writer thread after each commit.
+    """
+    if writer.on_commit is not None:
+        try:
+            writer.on_commit(committed)
+        except Exception as e:
+            logger.error(f"⛔ Commit callback failed: {e}")
+
+
+class SampleJournal(GroupCommitWriter):
+    """
+    A small append-only binary journal of dataset rows, which keeps rows
+    durable until the dataset writer has committed them.
+
+    Every row handed to the dataset is also queued here and written by a
+    background thread as a record of <length><crc32><JSON payload>. Each
+    group is fsynced together after `sync_rows` rows or `sync_interval`
+    seconds. When the dataset writer reports a commit (checkpoint), the
+    journal records what that commit covers: a fully covered segment is
+    truncated or deleted, and a partly covered one gets a checkpoint record
+    ({"covered": n}: its first n rows are in the dataset). The current
+    segment is then rolled over, so segments stay small.
+
+    On the next start, recover() returns the rows of a previous session
+    that no checkpoint covers, so they can be replayed into the dataset. A
+    torn record at the end of a segment (an interrupted write) is detected
+    by its length or checksum and trimmed. Rows are only replayed twice if
+    the process dies between a dataset commit and its checkpoint record.
+    """
+    RECORD = struct.Struct("<II")  # payload length, crc32 of payload
+    label = "sample journal"
+
+    def __init__(self, base_path, sync_rows=JOURNAL_SYNC_ROWS, sync_interval=JOURNAL_SYNC_INTERVAL):
+        """
+        Args:
+            base_path: Path prefix of the segment files ("<base_path>.000001", ...).
+            sync_rows: Number of rows written between fsyncs.
+            sync_interval: Maximum seconds a written row may stay unsynced.
+        """
+        super().__init__(sync_rows, sync_interval)
+        self.base_path = base_path
+        self.lock = threading.Lock()
+        # Oldest first; while running, the last one is open for writing. Each
+        # holds the row index of every row record in the file (-1 for rows a
+        # previous session had already checkpointed) and how many of them
+        # the file's last checkpoint record covers.
+        self.segments = []
+        self.written = 0           # Index of the next row written to the journal
+        self.checkpointed = 0      # Rows [0, checkpointed) are committed to the dataset
+        self.segment_number = 0
+        self.f = None
+        self.end = 0               # Size of the current segment before the last write
+
+    def _segment_paths(self):
+        """Returns the existing segment files, oldest first."""
+        directory = os.path.dirname(self.base_path) or "."
+        prefix = os.path.basename(self.base_path) + "."
+        names = [n for n in os.listdir(directory) if n.startswith(prefix) and n[len(prefix):].isdigit()]
+        return [os.path.join(directory, n) for n in sorted(names, key=lambda n: int(n[len(prefix):]))]
+
+    def _record(self, item):
+        """Encodes a row or checkpoint record."""
+        payload = json.dumps(item, ensure_ascii=False).encode('utf-8')
+        return self.RECORD.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def _read_segment(self, path):
+        """
+        Reads a segment, trimming a torn or corrupt tail.
+
+        Returns:
+            A tuple (rows, covered): all row records, and how many of them
+            the last checkpoint record covers.
+        """
+        rows = []
+        covered = 0
+        with open(path, 'r+b') as f:
+            data = f.read()
+            offset = 0
+            while offset + self.RECORD.size <= len(data):
+                length, crc = self.RECORD.unpack_from(data, offset)
+                payload = data[offset + self.RECORD.size:offset + self.RECORD.size + length]
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                item = json.loads(payload.decode('utf-8'))
+                if isinstance(item, dict):
+                    covered = item["covered"]
+                else:
+                    rows.append(item)
+                offset += self.RECORD.size + length
+            if offset < len(data):
+                logger.warning(f"⚠️ Trimmed a torn journal record ({len(data) - offset} bytes) from {path}.")
+                f.truncate(offset)
+                f.flush()
+                os.fsync(f.fileno())
+        return rows, covered
+
+    def recover(self):
+        """
+        Reads the rows a previous session journaled but never committed to
+        the dataset. Call once, before start(); the caller must write the
+        returned rows to the dataset first, so the row indices of the
+        checkpoints line up.
+
+        Returns:
+            The rows, oldest first.
+        """
+        rows = []
+        for path in self._segment_paths():
+            self.segment_number = int(path.rsplit(".", 1)[1])
+            segment_rows, covered = self._read_segment(path)
+            if covered >= len(segment_rows):
+                os.remove(path)
+                continue
+            indices = [-1] * covered + list(range(len(rows), len(rows) + len(segment_rows) - covered))
+            rows.extend(segment_rows[covered:])
+            self.segments.append({"path": path, "indices": indices, "covered": covered})
+        self.written = len(rows)
+        return rows
+
+    def start(self):
+        """Starts the writer thread, which opens a new segment."""
+        self.thread.start()
+
+    def checkpoint(self, committed):
+        """
+        Records what the dataset has committed. Called by the dataset writer
+        after each commit.
+
+        Args:
+            committed: Number of rows (since the dataset was opened, replayed
+                rows included) the dataset has made durable.
+        """
+        with self.lock:
+            if committed <= self.checkpointed:
+                return
+            self.checkpointed = committed
+            for segment in list(self.segments):
+                indices = segment["indices"]
+                covered = bisect.bisect_left(indices, committed)
+                if covered <= segment["covered"]:
+                    continue
+                current = self.f is not None and segment is self.segments[-1]
+                if current and covered == len(indices):
+                    self.f.seek(0)
+                    self.f.truncate()
+                    self.f.flush()
+                    os.fsync(self.f.fileno())
+                    segment["indices"] = []
+                    segment["covered"] = 0
+                    continue
+                if current:
+                    self._sync(self.f, self._record({"covered": covered}))
+                else:
+                    with open(segment["path"], 'ab') as f:
+                        self._sync(f, self._record({"covered": covered}))
+                segment["covered"] = covered
+                if covered == len(indices):
+                    # The checkpoint record keeps the rows from being replayed
+                    # even if the removal itself is lost in a crash.
+                    os.remove(segment["path"])
+                    self.segments.remove(segment)
+                elif current:
+                    self.f.close()
+                    self._open_segment()
+
+    def close(self):
+        """
+        Journals all queued rows and stops the writer thread. Segments that
+        are fully checkpointed are removed.
+        """
+        super().close()
+        with self.lock:
+            if self.f is not None:
+                self.f.close()
+                self.f = None
+                segment = self.segments[-1]
+                if not segment["indices"]:
+                    os.remove(segment["path"])
+                    self.segments.pop()
+
+    def _open_segment(self):
+        """Starts a new, empty segment file."""
+        self.segment_number += 1
+        path = f"{self.base_path}.{self.segment_number:06d}"
+        self.f = open(path, 'wb')
+        self.segments.append({"path": path, "indices": [], "covered": 0})
+
+    def _sync(self, f, data):
+        """Appends data to a segment file and fsyncs it."""
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+    def _open(self):
+        """Starts a new segment, unless the current one is still open."""
+        with self.lock:
+            if self.f is None:
+                self._open_segment()
+
+    def _commit(self, rows):
+        """Writes a group of rows and fsyncs them, skipping rows already committed."""
+        with self.lock:
+            records = []
+            indices = []
+            for index, row in enumerate(rows, self.written):
+                if index >= self.checkpointed:
+                    records.append(self._record(row))
+                    indices.append(index)
+            if records:
+                self.end = self.f.tell()
+                self._sync(self.f, b"".join(records))
+            self.segments[-1]["indices"].extend(indices)
+            self.written += len(rows)
+
+    def _abort(self):
+        """
+        Cuts the current segment back to its size before the failed write
+        (so later checkpoint records stay readable) and closes it; _open()
+        starts a new one.
+        """
+        with self.lock:
+            segment = self.segments[-1]
+            with contextlib.suppress(OSError):
+                self.f.close()
+            self.f = None
+            if segment["indices"]:
+                os.truncate(segment["path"], self.end)
+            else:
+                self.segments.pop()
+                os.remove(segment["path"])
+
+
+class LiveTableModel:
+    """
+    A ring-buffer view model for the live data table.
+
+    At most `capacity` rows are kept in the Treeview; inserting a new row
+    evicts the oldest one, so memory use and insert cost stay flat during
+    long sessions. Older rows are paged in from storage on demand, one
+    page of `capacity` rows at a time (page 0 is the live view).
+    """
+    def __init__(self, tree, capacity):
+        """
+        Args:
+            tree: The ttk.Treeview that displays the rows.
+            capacity: The maximum number of rows kept in the widget.
+        """
+        self.tree = tree
+        self.capacity = capacity
+        self.rows = deque(maxlen=capacity)
+        self.items = deque()
+        self.session_rows = 0
+        self.page = 0
+
+    def add(self, values):
+        """Adds a new row to the top of the live view."""
+        self.rows.append(values)
+        self.session_rows += 1
+        if self.page == 0:
+            self.items.append(self.tree.insert('', 0, values=values))
+            if len(self.items) > self.capacity:
+                self.tree.delete(self.items.popleft())
+
+    def show(self, rows):
+        """Replaces the table contents with `rows` (oldest first)."""
+        children = self.tree.get_children('')
+        if children:
+            self.tree.delete(*children)
+        self.items.clear()
+        for values in rows:
+            self.items.append(self.tree.insert('', 0, values=values))
+
+    def show_live(self):
+        """Returns to the live view of the most recent rows."""
+        self.page = 0
+        self.show(self.rows)
+
+    def oldest_live_row(self, first_live_row):
+        """
+        Returns the dataset row index of the oldest row in the live view.
+
+        Args:
+            first_live_row: The dataset row index of the first row added to
+                the live view (the rows before it were already in the
+                dataset or replayed from the journal).
+        """
+        return first_live_row + self.session_rows - len(self.rows)
+
+
+class PortWatcher:
+    """
+    Keeps the list of paired Bluetooth ports current without blocking the GUI.
+
+    Full enumeration runs on a background thread and the result is handed
+    to a callback. On Linux, when pyudev is installed, tty hot-plug events
+    add or drop single ports as they appear instead of rescanning
+    everything; elsewhere the list is rescanned on request only.
+    """
+    def __init__(self, on_change, ports=()):
+        """
+        Args:
+            on_change: Called from a worker thread with the new list of
+                (port, mac) tuples whenever it changes.
+            ports: The cached list to start from.
+        """
+        self.on_change = on_change
+        self.lock = threading.Lock()
+        self.ports = [tuple(p) for p in ports]
+        self.scanning = False
+        self.observer = None
+
+    def rescan(self):
+        """
+        Starts a full enumeration in the background.
+
+        Returns:
+            False if a scan is already running, True otherwise.
+        """
+        with self.lock:
+            if self.scanning:
+                return False
+            self.scanning = True
+        threading.Thread(target=self._scan, daemon=True).start()
+        return True
+
+    def _scan(self):
+        """Worker: enumerates all ports and publishes the result."""
+        try:
+            ports = list_paired_bluetooth_ports()
+        except Exception as e:
+            logger.warning(f"⚠️ Port enumeration failed: {e}")
+            ports = None
+        with self.lock:
+            self.scanning = False
+            if ports is not None:
+                self.ports = ports
+            ports = list(self.ports)
+        self.on_change(ports)
+
+    def start_hotplug(self):
+        """
+        Subscribes to tty hot-plug events through udev.
+
+        Returns:
+            True if hot-plug notifications are active, False if pyudev is
+            missing or udev is not available on this system.
+        """
+        try:
+            import pyudev
+        except ImportError:
+            return False
+        try:
+            monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+            monitor.filter_by(subsystem='tty')
+            self.observer = pyudev.MonitorObserver(monitor, callback=self._on_udev_event, name="port-hotplug")
+            self.observer.start()
+        except Exception as e:
+            logger.warning(f"⚠️ udev hot-plug monitoring unavailable: {e}")
+            self.observer = None
+            return False
+        return True
+
+    def _on_udev_event(self, device):
+        """Updates the cached list for a single added or removed tty device."""
+        node = device.device_node
+        if not node or device.action not in ('add', 'remove'):
+            return
+        entry = None
+        if device.action == 'add':
+            from serial.tools.list_ports_linux import SysFS
+            try:
+                entry = paired_port_entry(SysFS(node))
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read hot-plugged port {node}: {e}")
+                return
+        with self.lock:
+            ports = [p for p in self.ports if p[0] != node]
+            if entry:
+                ports.append(entry)
+            if ports == self.ports:
+                return
+            self.ports = ports
+        self.on_change(list(ports))
+
+    def stop(self):
+        """Stops hot-plug monitoring."""
+        if self.observer is not None:
+            self.observer.send_stop()
+            self.observer = None
+
+
+class LatestState:
+    """
+    A thread-safe buffer between the acquisition side and the GUI.
+
+    Worker threads publish rows and log lines here instead of scheduling
+    their own Tk callbacks. The GUI tick takes everything pending in one
+    call, so the widget work per second depends on the frame rate, not on
+    how fast data arrives.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.rows = []
+        self.log_lines = []
+        self.ports = None
+
+    def add_row(self, timestamp, row_data):
+        """Publishes a sample row. Safe to call from any thread."""
+        with self.lock:
+            self.rows.append((timestamp, row_data))
+
+    def add_log(self, line):
+        """Publishes a log line. Safe to call from any thread."""
+        with self.lock:
+            self.log_lines.append(line)
+
+    def set_ports(self, ports):
+        """Publishes a new list of paired ports. Safe to call from any thread."""
+        with self.lock:
+            self.ports = ports
+
+    def take_ports(self):
+        """
+        Takes the latest published port list.
+
+        Returns:
+            The list of (port, mac) tuples, or None if it has not changed
+            since the previous call.
+        """
+        with self.lock:
+            ports, self.ports = self.ports, None
+        return ports
+
+    def take(self):
+        """
+        Takes all pending updates.
+
+        Returns:
+            A tuple (rows, log_lines) of everything published since the
+            previous call, oldest first.
+        """
+        with self.lock:
+            rows, self.rows = self.rows, []
+            log_lines, self.log_lines = self.log_lines, []
+        return rows, log_lines
+
+
+# -------------------- Acquisition Engine --------------------
+class AcquisitionEngine:
+    """
+    Headless OBD acquisition: connects to the adapter, polls the sensors on
+    the sample clock and writes every row to the dataset. It has no GUI
+    dependency, so the Tkinter app, the command line and a daemon all drive
+    the same code.
+
+    Callers drive it with connect()/start()/stop()/disconnect()/close() and
+    observe it with subscribe(). Subscribers are called from the engine's
+    threads with (event, data):
+        "log"             (level, message)
+        "connected"       port name
+        "connect_failed"  reason
+        "connection_lost" None (the connection has already been closed)
+        "row"             (ISO timestamp, raw values in `headers` order)
+        "stopped"         None (monitoring ended on its own, e.g. an error)
+    """
+    def __init__(self, sample_period=REFRESH_RATE, storage=STORAGE_BACKEND, compression=DATASET_COMPRESSION):
+        """
+        Args:
+            sample_period: Seconds between logged rows.
+            storage: The dataset backend (see open_dataset).
+            compression: Compression of CSV datasets (see open_dataset).
+        """
+        self.connection = None
+        self.running = False
+        self.sample_period = sample_period
+        self.storage = storage
+        self.compression = compression
+        self.skipped = frozenset()
+        self.use_batching = BATCH_QUERIES
+        self.silent_batches = 0
+        self.batching_retry_at = None
+        self.response_counts = None
+        self.supported_pids = None
+        self.dataset = None
+        self.journal = None
+        self.replayed_rows = 0   # Rows replayed from the journal into the open dataset
+        self.vehicle = ("", "", "")
+        self.subscribers = []
+        self.lock = threading.Lock()
+        self.monitor_thread = None
+
+    def subscribe(self, callback):
+        """
+        Registers a callback for engine events.
+
+        Args:
+            callback: A function taking (event, data). It runs on an engine
+                thread, so it must be quick and thread-safe.
+
+        Returns:
+            The callback, for passing to unsubscribe().
+        """
+        self.subscribers = self.subscribers + [callback]
+        return callback
+
+    def unsubscribe(self, callback):
+        """Removes a callback registered with subscribe()."""
+        self.subscribers = [cb for cb in self.subscribers if cb is not callback]
+
+    def emit(self, event, data=None):
+        """Sends an event to every subscriber."""
+        for callback in self.subscribers:
+            callback(event, data)
+
+    def set_skipped(self, names):
+        """
+        Sets the acquisition profile: the named sensors are not polled and
+        are logged as empty (null) values. Takes effect at the next slot,
+        also while monitoring.
+
+        Args:
+            names: Sensor names to leave out; empty to poll everything.
+        """
+        skipped = frozenset(names)
+        if skipped == self.skipped:
+            return
+        self.skipped = skipped
+        if skipped:
+            self.log(f"⏸️ Not polling: {', '.join(n for n in SENSOR_BY_NAME if n in skipped)}")
+        else:
+            self.log("▶️ Polling all sensors.")
+
+    def log(self, msg, level=logging.INFO):
+        """Writes a message to the log file and publishes it to subscribers."""
+        logger.log(level, msg)
+        self.emit("log", (level, msg))
+
+    def log_error(self, msg):
+        """Logs an error reported by a dataset or journal writer thread."""
+        self.log(msg, logging.ERROR)
+
+    def is_connected(self):
+        """Returns True if the adapter connection is open."""
+        return self.connection is not None and self.connection.is_connected()
+
+    def connect(self, port, vehicle, mac=None):
+        """
+        Connects to the adapter in a background thread. The outcome is
+        reported with a "connected" or "connect_failed" event.
+
+        Args:
+            port: The serial port of the adapter.
+            vehicle: A (vehicle no, vehicle type, year) tuple. It is copied
+                here and written with every row of this connection.
+            mac: The adapter's MAC address, used to look up a cached
+                connection profile.
+
+        Returns:
+            The started thread.
+        """
+        self.vehicle = tuple(vehicle)
+        thread = threading.Thread(target=self.attempt_connection_on_port,
+                                  args=(port, self.vehicle[0], mac), daemon=True)
+        thread.start()
+        return thread
+
+    def attempt_connection_on_port(self, port, vehicle_key, mac=None):
+        """
+        Runs in a background thread to connect to the OBD adapter. Includes
+        logic for retries and a readiness probe before the link is used.
+
+        If a connection profile is cached for the adapter's MAC address, it
+        is replayed first; full protocol auto-detection is only used if that
+        fails.
+        """
+        profile = config.get("ADAPTER_PROFILES", {}).get(mac) if mac else None
+        if profile:
+            self.log(f"⚡ Reconnecting to {port} with cached profile (protocol {profile['protocol']})...")
+            try:
+                conn = ProfiledOBD(port, profile, timeout=5)
+                if conn.is_connected():
+                    self.finish_connection(conn, port, vehicle_key, mac, profile)
+                    return
+                conn.close()
+            except Exception as e:
+                self.log(f"⛔ Error on {port}: {str(e).strip()}", logging.ERROR)
+            self.log("⚠️ Cached profile failed. Falling back to full detection.", logging.WARNING)
+
+        for attempt in range(1, 4):
+            self.log(f"🧪 Trying connection on {port} (Attempt {attempt}/3)...")
+            try:
+                conn = OBD(portstr=port, baudrate=BAUDRATE, fast=False, timeout=5)
+                if conn.is_connected():
+                    self.log("⏳ Waiting for the link to answer consistently...")
+                    started = time.monotonic()
+                    if wait_until_ready(conn):
+                        self.log(f"🟢 Link ready after {time.monotonic() - started:.1f} s.")
+                        self.finish_connection(conn, port, vehicle_key, mac)
+                        return
+                    self.log(f"❌ {port} connected but never answered consistently.")
+                    conn.close()
+                else:
+                    self.log(f"❌ {port} did not respond as an OBD device.")
+                    conn.close()
+            except Exception as e:
+                self.log(f"⛔ Error on {port}: {str(e).strip()}", logging.ERROR)
+            time.sleep(2)
+        self.log(f"🚫 All connection attempts failed for {port}.")
+        self.emit("connect_failed", "Connection Failed")
+
+    def finish_connection(self, conn, port, vehicle_key, mac, profile=None):
+        """
+        Completes a successful connection in the background thread: loads
+        the supported PIDs, configures low-latency queries and refreshes
+        the adapter profile.
+        """
+        self.log(f"✅ Connection successful on {port}!")
+        self.supported_pids, signature = discover_supported_pids(conn, vehicle_key, profile)
+        if self.supported_pids is None:
+            self.log("⚠️ Could not read supported PIDs. All sensors will be polled.", logging.WARNING)
+        else:
+            skipped = [name for name, cmd in SENSOR_COMMANDS.items()
+                       if cmd.pid not in self.supported_pids]
+            if skipped:
+                self.log(f"ℹ️ Not supported by this vehicle: {', '.join(skipped)}")
+        if mac and signature:
+            save_adapter_profile(mac, conn, BAUDRATE if profile is None else profile["baudrate"],
+                                 signature, self.supported_pids)
+        self.use_batching = BATCH_QUERIES
+        self.silent_batches = 0
+        self.batching_retry_at = None
+        self.response_counts = None
+        if LOW_LATENCY_QUERIES:
+            self.response_counts = ResponseCountCache()
+            if not enable_adaptive_timing(conn):
+                self.log("⚠️ Adapter rejected adaptive timing (ATAT).", logging.WARNING)
+        self.connection = conn
+        self.emit("connected", port)
+
+    def disconnect(self):
+        """Stops monitoring and closes the connection without blocking the caller."""
+        self.running = False
+        conn, self.connection = self.connection, None
+        if conn is not None:
+            threading.Thread(target=conn.close, daemon=True).start()
+
+    def start(self):
+        """
+        Starts monitoring in a background thread, opening the dataset (and
+        the sample journal, see open_journal) on first use.
 
-# -------------------- Global Settings --------------------
-config = load_config()
-TIMEZONE = "Asia/Karachi"
-CSV_FILENAME = "obd_dataset.csv"
-UNITS = "metric"
-REFRESH_RATE = 2.0
-BAUDRATE = 38400
+        Returns:
+            False if monitoring is already running, True otherwise.
+        """
+        if self.running:
+            return False
+        with self.lock:
+            if self.dataset is None:
+                self.replayed_rows = 0
+                try:
+                    self.dataset = open_dataset(self.storage, self.compression)
+                except ImportError as e:
+                    self.log(f"⚠️ {e.name} is not installed; writing an uncompressed CSV instead.", logging.WARNING)
+                    self.dataset = open_dataset("csv", None)
+                self.dataset.on_error = self.log_error
+                if JOURNAL_ENABLED:
+                    self.open_journal()
+        self.running = True
+        self.monitor_thread = threading.Thread(target=self.monitor_data, daemon=True)
+        self.monitor_thread.start()
+        return True
 
-# -------------------- Headers --------------------
-headers = [
-    "Timestamp", "Coolant Temp", "Oil Temp", "Engine RPM", "Throttle Pos", "Engine Load",
-    "Speed", "Fuel Level", "Fuel Pressure", "Intake Temp", "Ambient Temp"
-]
+    def stop(self, timeout=None):
+        """
+        Stops monitoring.
 
-# -------------------- Utility Functions --------------------
-def extract_mac_from_hwid(hwid: str) -> str:
-    """
-    Extracts a MAC address from a device's hardware ID string.
+        Args:
+            timeout: Seconds to wait for the monitoring thread to finish its
+                current query; None returns immediately.
+        """
+        self.running = False
+        thread = self.monitor_thread
+        if timeout is not None and thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
 
-    Args:
-        hwid: The hardware ID string provided by pyserial.
+    def close(self):
+        """
+        Stops monitoring, closes the dataset (writing all queued rows) and the
+        connection. Waits up to STOP_TIMEOUT seconds for a query in flight,
+        so the monitoring thread never sees the connection closed under it.
+        """
+        self.stop(timeout=STOP_TIMEOUT)
+        with self.lock:
+            writer, self.dataset = self.dataset, None
+            journal, self.journal = self.journal, None
+        if writer is not None:
+            writer.close()
+        if journal is not None:
+            journal.close()
+        if self.is_connected():
+            self.disconnect()
 
-    Returns:
-        A formatted MAC address string or a zero-MAC if not found.
-    """
-    match = re.search(r'&([0-9A-F]{12})', hwid.upper())
-    if match:
-        mac_raw = match.group(1)
-        return ":".join(mac_raw[i:i+2] for i in range(0, 12, 2))
-    return "00:00:00:00:00:00"
+    def open_journal(self):
+        """
+        Opens the sample journal for the freshly opened dataset. Rows a
+        previous session journaled but never committed (a crash, a killed
+        process, a laptop that slept and lost power) are replayed into the
+        dataset first. Called with the lock held.
+        """
+        journal = SampleJournal(JOURNAL_PATH)
+        try:
+            rows = journal.recover()
+        except (OSError, ValueError) as e:
+            self.log(f"⚠️ Could not read the sample journal, not journaling this session: {e}", logging.WARNING)
+            return
+        journal.on_error = self.log_error
+        self.dataset.on_commit = journal.checkpoint
+        if rows:
+            self.log(f"♻️ Replaying {len(rows)} row(s) from the sample journal into the dataset.")
+            for row in rows:
+                self.dataset.write(row)
+            self.replayed_rows = len(rows)
+        journal.start()
+        self.journal = journal
 
-def list_paired_bluetooth_ports():
-    """
-    Filters for COM ports associated with a paired Bluetooth device by
-    checking for a valid (non-zero) MAC address in the hardware ID.
+    def monitor_data(self):
+        """
+        The main data-gathering loop. Runs in a background thread to
+        continuously query the vehicle for new data. Includes error handling.
 
-    Returns:
-        A list of tuples, where each tuple contains the port name and its
-        associated MAC address, e.g., [('COM4', '00:1D:A5:08:49')].
-    """
-    all_ports = serial.tools.list_ports.comports()
-    paired_ports = []
-    for port in all_ports:
-        if "Bluetooth" in port.description:
-            mac = extract_mac_from_hwid(port.hwid)
-            if mac != "00:00:00:00:00:00":
-                paired_ports.append((port.device, mac))
-    return paired_ports
+        Between sample deadlines (see SampleClock), each bus time slot is
+        filled with the most overdue sensors (see PollScheduler). At every
+        deadline one row is emitted, stamped with the start of its slot,
+        which is when its sensors were read; sensors not polled since the
+        previous row keep their last value, so every row is complete.
+        """
+        # Polling faster than rows are logged only keeps the bus busy: every
+        # read but the last before a row would be overwritten unrecorded.
+        sample_rate = 1.0 / self.sample_period
+        scheduler = PollScheduler({name: min(rate, sample_rate) for name, rate in POLL_RATES.items()},
+                                  sample_rate)
+        clock = SampleClock(self.sample_period)
+        last_values = {name: None for name in SENSOR_COMMANDS}
+        # A stopped loop may still be finishing a query when monitoring is
+        # restarted; it must not keep running alongside its replacement.
+        me = threading.current_thread()
+        while self.running and self.monitor_thread is me:
+            try:
+                if not self.is_connected():
+                    self.log("⚠️ Connection lost! Stopping monitoring.", logging.WARNING)
+                    self.disconnect()
+                    self.emit("connection_lost")
+                    break
 
-def get_formatted_value(response):
-    """
-    Formats an OBD response object into a specific, human-readable string.
-    This function applies custom units and rounding based on the command type.
+                polled = self.polled_sensors()
+                slot_start = time.monotonic()
+                if slot_start < clock.deadline:
+                    slot_size = PID_BATCH_SIZE if self.use_batching else 1
+                    names = scheduler.next_slot(polled, slot_start, slot_size)
+                    if not names:
+                        wake_at = min(scheduler.next_due_time(polled), clock.deadline)
+                        time.sleep(max(0.0, wake_at - slot_start))
+                        continue
+                    self.log(f"Querying {', '.join(names)}...", logging.DEBUG)
+                    responses = self.query_sensors([SENSOR_COMMANDS[name] for name in names])
+                    scheduler.mark_polled(names, slot_start)
+                    for name in names:
+                        sensor = SENSOR_BY_NAME[name]
+                        last_values[name] = decode_sensor(sensor, responses.get(sensor.command))
+                    continue
 
-    Args:
-        response: An OBD response object from the python-obd library.
+                sample_time, overrun, missed = clock.tick()
+                if missed:
+                    self.log(f"⚠️ Sample overran by {overrun * 1000:.0f} ms, skipped {missed} slot(s).", logging.WARNING)
+                elif overrun > 0.1 * clock.period:
+                    self.log(f"⚠️ Sample overran by {overrun * 1000:.0f} ms.", logging.WARNING)
+                self.log("Data received. Writing row...", logging.DEBUG)
+                skipped = self.skipped
+                self.record_row(sample_time.isoformat(),
+                                [None if h in skipped else last_values.get(h) for h in headers[1:]])
+            except Exception as e:
+                self.log(f"⛔ ERROR in monitoring loop: {e}", logging.ERROR)
+                self.log("⏹️ Halting monitoring due to error.")
+                self.emit("stopped")
+                break
+        if clock.skipped:
+            self.log(f"ℹ️ Sample clock skipped {clock.skipped} slot(s), max overrun {clock.max_overrun * 1000:.0f} ms.")
+        if self.monitor_thread is me:
+            self.running = False
 
-    Returns:
-        A formatted string for display (e.g., "93 °C", "758.5", "13.7 %").
+    def record_row(self, timestamp, row_data):
+        """
+        Hands a sample row to the background dataset writer (and journal)
+        and publishes it.
+
+        Args:
+            timestamp: The ISO timestamp of the sample.
+            row_data: Raw sensor values (or None) in `headers` order. They are
+                only formatted with units for a CSV dataset when numeric
+                logging is off.
+        """
+        with self.lock:
+            dataset = self.dataset
+            if dataset is not None:
+                if NUMERIC_LOGGING or dataset.typed:
+                    values = row_data
+                else:
+                    values = [format_value(sensor, v) for sensor, v in zip(SENSORS, row_data)]
+                row = [timestamp, *self.vehicle] + values
+                dataset.write(row)
+                if self.journal is not None:
+                    self.journal.write(row)
+        self.emit("row", (timestamp, row_data))
+
+    def polled_sensors(self):
+        """Returns the names of the sensors to poll, skipping unsupported and skipped PIDs."""
+        skipped = self.skipped
+        return [name for name, cmd in SENSOR_COMMANDS.items()
+                if name not in skipped and (self.supported_pids is None or cmd.pid in self.supported_pids)]
+
+    def query_sensors(self, cmds):
+        """
+        Queries the given commands, packing them into multi-PID requests
+        when batching is enabled. A multi-PID request that gets no answer at
+        all is retried one PID at a time. Only when BATCH_FALLBACK_AFTER such
+        requests in a row are answered one by one is the ECU taken not to
+        support multi-PID requests: batching is switched off, and tried
+        again after BATCH_RETRY_INTERVAL seconds. A transient NO DATA, or
+        PIDs the ECU does not support, leave batching on.
+
+        Returns:
+            A dict mapping each answered command to its reply data bytes
+            (see query_batch).
+        """
+        if self.batching_retry_at is not None and time.monotonic() >= self.batching_retry_at:
+            self.log("🔁 Trying multi-PID requests again.", logging.DEBUG)
+            self.batching_retry_at = None
+            self.use_batching = True
+            self.silent_batches = BATCH_FALLBACK_AFTER - 1  # one more miss falls back again
+        responses = {}
+        for i in range(0, len(cmds), PID_BATCH_SIZE):
+            batch = cmds[i:i + PID_BATCH_SIZE]
+            replies = {}
+            if self.use_batching:
+                replies = query_batch(self.connection, batch, self.response_counts)
+                if replies and len(batch) > 1:
+                    self.silent_batches = 0
+            if not replies and (len(batch) > 1 or not self.use_batching):
+                for cmd in batch:
+                    replies.update(query_batch(self.connection, [cmd], self.response_counts))
+                if replies and self.use_batching:
+                    self.silent_batches += 1
+                    if self.silent_batches >= BATCH_FALLBACK_AFTER:
+                        self.log("⚠️ ECU did not answer multi-PID requests. Falling back to single queries.", logging.WARNING)
+                        self.use_batching = False
+                        self.batching_retry_at = time.monotonic() + BATCH_RETRY_INTERVAL
+            responses.update(replies)
+        return responses
+
+
+# -------------------- Acquisition Process --------------------
+def open_shared_memory(name, create=False, size=0):
     """
-    if response is None or response.is_null() or response.value is None:
-        return "N/A"
+    Opens a named shared memory block. Only the creator tracks the block:
+    Python's resource tracker would otherwise unlink it as soon as any
+    process that attached to it exits, e.g. when the GUI is closed.
+    """
+    if create:
+        return shared_memory.SharedMemory(name, create=True, size=size)
+    try:
+        return shared_memory.SharedMemory(name, track=False)
+    except TypeError:  # Python < 3.13 has no 'track' argument
+        shm = shared_memory.SharedMemory(name)
+        if os.name == 'posix':
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
 
-    value = response.value.magnitude
-    cmd = response.command
-
-    # Apply specific formatting based on the command
-    if cmd in (commands.COOLANT_TEMP, commands.INTAKE_TEMP, commands.AMBIANT_AIR_TEMP, commands.OIL_TEMP):
-        return f"{value:.0f} °C"
-    elif cmd == commands.RPM:
-        return f"{value:.1f}"
-    elif cmd in (commands.THROTTLE_POS, commands.ENGINE_LOAD, commands.FUEL_LEVEL):
-        return f"{value:.1f} %"
-    elif cmd == commands.SPEED:
-        return f"{value:.1f} km/h"
-    elif cmd == commands.FUEL_PRESSURE:
-        return f"{value:.1f} kPa"
-    else:
-        return str(value)
+def process_alive(pid):
+    """Returns False if a process with this ID is known not to exist."""
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
 
 
-def initialize_csv(file_path):
+class SharedRing:
     """
-    Creates the CSV file and writes the header row if the file doesn't exist.
+    A single-writer ring buffer of fixed-size records in named shared
+    memory, used to pass samples and events from the acquisition process to
+    any number of GUI processes.
 
-    Args:
-        file_path: The path to the CSV file.
+    The writer fills a slot and then bumps the record count; readers copy
+    the slots they need and re-check the count afterwards, dropping any
+    slot the writer may have reused meanwhile. Nobody ever waits on a lock,
+    so a slow or frozen reader cannot add jitter to the writer.
+
+    The header also carries the writer's PID, an "alive" flag cleared on
+    clean shutdown, a stop-request flag set by readers, and a short status
+    string.
     """
-    if not os.path.isfile(file_path):
-        with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.writer(f)
-            writer.writerow(["Timestamp", "Vehicle No", "Vehicle Type", "Year"] + headers[1:])
+    MAGIC = b"OBDRING1"
+    HEADER = struct.Struct("<8sIIIII4xQ256s")  # magic, slot size, capacity, pid, stop, alive, count, status
+    PID_OFFSET = 16
+    STOP_OFFSET = 20
+    ALIVE_OFFSET = 24
+    COUNT_OFFSET = 32
+    STATUS_OFFSET = 40
+    LENGTH = struct.Struct("<I")
+
+    def __init__(self, shm, owner):
+        self.shm = shm
+        self.owner = owner
+        self.buf = shm.buf
+        magic, self.slot_size, self.capacity = struct.unpack_from("<8sII", self.buf, 0)
+        if magic != self.MAGIC:
+            raise ValueError(f"Shared memory block '{shm.name}' is not an OBD ring buffer.")
+
+    @classmethod
+    def create(cls, name, slot_size, capacity):
+        """
+        Creates the ring as its only writer. A block left behind by a
+        writer that crashed is replaced.
+
+        Raises:
+            FileExistsError: If a live writer already owns the ring.
+        """
+        size = cls.HEADER.size + slot_size * capacity
+        try:
+            shm = open_shared_memory(name, create=True, size=size)
+        except FileExistsError:
+            stale = cls.attach(name)
+            if stale.writer_alive():
+                stale.close()
+                raise
+            stale.close()
+            shared_memory.SharedMemory(name).unlink()
+            shm = open_shared_memory(name, create=True, size=size)
+        cls.HEADER.pack_into(shm.buf, 0, cls.MAGIC, slot_size, capacity, os.getpid(), 0, 1, 0, b"")
+        return cls(shm, owner=True)
+
+    @classmethod
+    def attach(cls, name):
+        """
+        Attaches to an existing ring as a reader.
+
+        Raises:
+            FileNotFoundError: If no acquisition process has created it.
+        """
+        return cls(open_shared_memory(name), owner=False)
+
+    def count(self):
+        """Returns the number of records ever written."""
+        return struct.unpack_from("<Q", self.buf, self.COUNT_OFFSET)[0]
+
+    def append(self, payload):
+        """Writes one record (writer only). Payloads longer than a slot are truncated."""
+        payload = payload[:self.slot_size - self.LENGTH.size]
+        index = self.count()
+        offset = self.HEADER.size + (index % self.capacity) * self.slot_size
+        self.LENGTH.pack_into(self.buf, offset, len(payload))
+        self.buf[offset + self.LENGTH.size:offset + self.LENGTH.size + len(payload)] = payload
+        struct.pack_into("<Q", self.buf, self.COUNT_OFFSET, index + 1)
+
+    def read_since(self, cursor):
+        """
+        Reads the records written since a previous call.
+
+        Args:
+            cursor: The count returned by the previous call, or 0.
+
+        Returns:
+            A tuple (records, cursor, lost): the payloads in write order, the
+            cursor for the next call, and how many records were overwritten
+            before they could be read.
+        """
+        count = self.count()
+        first = max(cursor, count - self.capacity)
+        records = []
+        for index in range(first, count):
+            offset = self.HEADER.size + (index % self.capacity) * self.slot_size
+            length = self.LENGTH.unpack_from(self.buf, offset)[0]
+            start = offset + self.LENGTH.size
+            records.append(bytes(self.buf[start:start + length]))
+        # The writer may be filling slot 'count' right now, which reuses the
+        # slot of record 'count - capacity'.
+        reused = self.count() - self.capacity - first + 1
+        if reused > 0:
+            records = records[reused:]
+            first += reused
+        return records, count, max(0, first - cursor)
+
+    def set_status(self, status):
+        """Publishes a short status string (writer only)."""
+        data = status.encode('utf-8')[:255]
+        self.buf[self.STATUS_OFFSET:self.STATUS_OFFSET + 256] = data.ljust(256, b"\0")
+
+    def status(self):
+        """Returns the writer's status string."""
+        return bytes(self.buf[self.STATUS_OFFSET:self.STATUS_OFFSET + 256]).rstrip(b"\0").decode('utf-8', 'replace')
+
+    def request_stop(self):
+        """Asks the writer to shut down (reader side)."""
+        struct.pack_into("<I", self.buf, self.STOP_OFFSET, 1)
+
+    def stop_requested(self):
+        """Returns True once a reader has called request_stop()."""
+        return struct.unpack_from("<I", self.buf, self.STOP_OFFSET)[0] != 0
+
+    def writer_alive(self):
+        """Returns True while the writer process is running."""
+        alive, = struct.unpack_from("<I", self.buf, self.ALIVE_OFFSET)
+        pid, = struct.unpack_from("<I", self.buf, self.PID_OFFSET)
+        return alive != 0 and process_alive(pid)
 
-def append_row_to_csv(file_path, row):
+    def close(self, unlink=False):
+        """Detaches from the ring; the writer marks itself gone and unlinks it."""
+        if self.owner:
+            struct.pack_into("<I", self.buf, self.ALIVE_OFFSET, 0)
+        self.buf = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+# Samples travel as a fixed-size record: the ISO timestamp, then one
+# double per sensor with NaN standing in for "no data".
+ROW_RECORD = struct.Struct(f"<32s{len(headers) - 1}d")
+
+def encode_row(timestamp, row_data):
+    """Packs a sample row into a ring record."""
+    return ROW_RECORD.pack(timestamp.encode('ascii'),
+                           *(math.nan if v is None else float(v) for v in row_data))
+
+def decode_row(record):
+    """Unpacks a ring record into (ISO timestamp, raw values)."""
+    timestamp, *values = ROW_RECORD.unpack(record)
+    return timestamp.rstrip(b"\0").decode('ascii'), [None if math.isnan(v) else v for v in values]
+
+
+class DaemonPublisher:
     """
-    Appends a single row of data to the specified CSV file.
+    Engine subscriber used in daemon mode: copies rows and events into
+    shared memory for GUI processes to read, and keeps a status record
+    (state, port and vehicle) that a newly attached GUI can show at once.
+    """
+    def __init__(self, vehicle, port):
+        self.rows = SharedRing.create(f"{SHM_NAME}_rows", ROW_RECORD.size + SharedRing.LENGTH.size, ROW_RING_SLOTS)
+        try:
+            self.events = SharedRing.create(f"{SHM_NAME}_events", EVENT_SLOT_BYTES, EVENT_RING_SLOTS)
+        except Exception:
+            self.rows.close(unlink=True)
+            raise
+        self.info = {"state": "connecting", "port": port, "vehicle": list(vehicle)}
+        self.events.set_status(json.dumps(self.info))
+        # Engine events arrive from several threads; each ring has one writer.
+        self.lock = threading.Lock()
+        self.closed = False
 
-    Args:
-        file_path: The path to the CSV file.
-        row: A list of data values to be written as a new row.
+    def __call__(self, event, data):
+        if event == "row":
+            record = encode_row(*data)
+            with self.lock:
+                if not self.closed:
+                    self.rows.append(record)
+            return
+        if event == "log" and data[0] < LOG_LEVEL:
+            return  # per-cycle messages would crowd the ring; they are in the log file
+        if event == "connected":
+            self.info["state"] = "connected"
+        elif event in ("connect_failed", "connection_lost", "stopped"):
+            self.info["state"] = "reconnecting"
+        stamp = datetime.now().strftime('%H:%M:%S')
+        record = json.dumps([event, data, stamp]).encode('utf-8')
+        with self.lock:
+            if self.closed:
+                return  # a late event from a thread that outlived close()
+            self.events.set_status(json.dumps(self.info))
+            self.events.append(record)
+
+    def stop_requested(self):
+        """Returns True if a GUI asked the daemon to disconnect."""
+        return self.events.stop_requested()
+
+    def close(self):
+        """Marks the daemon as gone and removes the shared memory."""
+        with self.lock:
+            self.closed = True
+            self.rows.close(unlink=True)
+            self.events.close(unlink=True)
+
+
+class DaemonClient:
     """
-    with open(file_path, 'a', newline='', encoding='utf-8-sig') as f:
-        writer = csv.writer(f)
-        writer.writerow(row)
+    GUI-side view of a running acquisition daemon. Reading never blocks
+    the daemon; the GUI can detach and re-attach at any time without
+    affecting the vehicle connection.
+    """
+    def __init__(self):
+        self.rows = SharedRing.attach(f"{SHM_NAME}_rows")
+        try:
+            self.events = SharedRing.attach(f"{SHM_NAME}_events")
+        except Exception:
+            self.rows.close()
+            raise
+        # Replay what the rings still hold, so the table and log are not
+        # empty after a GUI restart.
+        self.row_cursor = 0
+        self.event_cursor = 0
+
+    def poll(self):
+        """
+        Returns everything published since the previous call.
+
+        Returns:
+            A tuple (rows, events, lost_rows): rows as (timestamp, values),
+            events as (event, data, time string), and the number of rows
+            that were overwritten before they could be read.
+        """
+        records, self.row_cursor, lost = self.rows.read_since(self.row_cursor)
+        rows = [decode_row(r) for r in records]
+        records, self.event_cursor, _ = self.events.read_since(self.event_cursor)
+        events = []
+        for record in records:
+            try:
+                events.append(tuple(json.loads(record.decode('utf-8'))))
+            except ValueError:
+                continue  # truncated by the slot size
+        return rows, events, lost
+
+    def status(self):
+        """Returns the daemon's status record (state, port, vehicle)."""
+        try:
+            return json.loads(self.events.status())
+        except ValueError:
+            return {}
+
+    def alive(self):
+        """Returns True while the daemon process is running."""
+        return self.events.writer_alive()
+
+    def request_stop(self):
+        """Asks the daemon to disconnect and exit."""
+        self.events.request_stop()
+
+    def close(self):
+        """Detaches from the daemon, leaving it running."""
+        self.rows.close()
+        self.events.close()
+
 
 # -------------------- GUI Class --------------------
 class OBDLoggerApp:
@@ -166,33 +3012,50 @@ class OBDLoggerApp:
     The main class for the OBD-II Logger GUI application.
     This class handles the window, widgets, and all application logic.
     """
-    def __init__(self, root):
+    def __init__(self, root, use_process=ACQUISITION_PROCESS):
         """
         Initializes the main application class.
 
         Args:
             root: The root Tkinter window object.
+            use_process: Run acquisition in a separate daemon process that
+                keeps the vehicle connection when the GUI is closed.
         """
         self.root = root
         self.root.title("OBD-II Logger GUI v15.0")
 
-        self.connection = None
-        self.running = False
+        self.engine = AcquisitionEngine()
+        self.state = LatestState()
+        self.engine.subscribe(self.on_engine_event)
+        self.use_process = use_process
+        self.daemon = None
+        self.daemon_status = None
+        self.daemon_wait_until = None
+        self.log_listener = setup_file_logging(LOG_FILE)
         self.port_map = {}
+        self.port_macs = {}
+        self.port_watcher = PortWatcher(self.state.set_ports, config.get("PORT_CACHE", []))
 
         # --- Tkinter String/Boolean Variables ---
         self.veh_no = tk.StringVar(value=config.get("VEH_NO"))
         self.veh_type = tk.StringVar(value=config.get("VEH_TYPE"))
         self.yr_mfr = tk.StringVar(value=config.get("YR_MFR"))
-        self.column_vars = {h: tk.BooleanVar(value=True) for h in headers}
+        hidden = set(config.get("HIDDEN_COLUMNS", []))
+        self.column_vars = {h: tk.BooleanVar(value=h not in hidden) for h in headers}
+        self.poll_visible_only = tk.BooleanVar(value=config.get("POLL_VISIBLE_ONLY", False))
         self.last_sort = {'col': None, 'rev': False}
         self.display_veh_no = tk.StringVar(value="Vehicle No: --")
         self.display_veh_type = tk.StringVar(value="Vehicle Type: --")
         self.display_yr_mfr = tk.StringVar(value="Year: --")
 
         self.create_widgets()
+        self.show_ports(self.port_watcher.ports, cached=True)
         self.update_ports_list()
+        if self.port_watcher.start_hotplug():
+            self.log("🔌 Watching for Bluetooth serial ports being added or removed.")
+        self.attach_daemon()
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.after(int(1000 / GUI_FPS), self.gui_tick)
 
     def create_widgets(self):
         """Builds and lays out all the GUI elements in the main window."""
@@ -212,6 +3075,9 @@ class OBDLoggerApp:
         for i, col in enumerate(headers):
             cb = ttk.Checkbutton(frm_cols, text=col, variable=self.column_vars[col], command=self.update_visible_columns)
             cb.grid(row=0, column=i, padx=5, sticky='w')
+        ttk.Checkbutton(frm_cols, text="Poll shown columns only (hidden sensors are logged empty)",
+                        variable=self.poll_visible_only, command=self.update_visible_columns
+                        ).grid(row=1, column=0, columnspan=len(headers), padx=5, sticky='w')
 
         # --- Main Controls Frame ---
         frm_controls = ttk.Frame(self.root)
@@ -253,6 +3119,16 @@ class OBDLoggerApp:
         
         self.tree.pack(side='left', fill='both', expand=True)
         self.update_visible_columns()
+        self.table = LiveTableModel(self.tree, MAX_TABLE_ROWS)
+
+        # --- Table Paging Frame ---
+        frm_pages = ttk.Frame(self.root)
+        frm_pages.pack(fill='x', padx=10)
+        ttk.Button(frm_pages, text="◀ Older", command=lambda: self.show_page(self.table.page + 1), width=10).pack(side='left')
+        ttk.Button(frm_pages, text="Newer ▶", command=lambda: self.show_page(self.table.page - 1), width=10).pack(side='left', padx=5)
+        ttk.Button(frm_pages, text="Live", command=lambda: self.show_page(0), width=6).pack(side='left')
+        self.page_label = ttk.Label(frm_pages, text=f"Live view (last {MAX_TABLE_ROWS} rows)")
+        self.page_label.pack(side='left', padx=10)
 
         # --- Log Output Frame ---
         log_frame = ttk.Frame(self.root)
@@ -269,6 +3145,16 @@ class OBDLoggerApp:
         """Shows/hides columns in the Treeview based on checkbox states."""
         visible_cols = [h for h, var in self.column_vars.items() if var.get()]
         self.tree["displaycolumns"] = visible_cols
+        self.engine.set_skipped(self.skipped_sensors())
+
+    def skipped_sensors(self):
+        """
+        Returns the sensors left out by the acquisition profile: the hidden
+        ones when 'Poll shown columns only' is ticked, otherwise none.
+        """
+        if not self.poll_visible_only.get():
+            return []
+        return [h for h in headers[1:] if not self.column_vars[h].get()]
 
     def sort_column(self, col, reverse):
         """
@@ -291,89 +3177,280 @@ class OBDLoggerApp:
             self.tree.move(k, '', index)
         self.tree.heading(col, command=lambda: self.sort_column(col, not reverse))
 
+    def show_page(self, page):
+        """
+        Shows a page of the data table. Page 0 is the live view; higher pages
+        hold progressively older rows, read back from the dataset on demand.
+        """
+        if page <= 0:
+            self.table.show_live()
+            self.page_label.config(text=f"Live view (last {MAX_TABLE_ROWS} rows)")
+            return
+        if self.daemon is not None:
+            self.log("Older rows are kept by the acquisition process; open the dataset file to browse them.")
+            return
+        dataset = self.engine.dataset
+        if dataset is None:
+            self.log("No dataset is open yet; older rows are not available.")
+            return
+        if not hasattr(dataset, "read_rows"):
+            self.log(f"Paging older rows is not available with {self.engine.storage} storage.")
+            return
+        end = (self.table.oldest_live_row((dataset.base_rows or 0) + self.engine.replayed_rows)
+               - (page - 1) * MAX_TABLE_ROWS)
+        first = max(0, end - MAX_TABLE_ROWS)
+        rows = dataset.read_rows(first, end - first)
+        if not rows:
+            self.log("No older rows in the dataset.")
+            return
+        self.table.page = page
+        self.table.show([self.display_values(r[0], r[4:]) for r in rows])
+        self.page_label.config(text=f"Rows {first + 1}–{first + len(rows)} of {dataset.flushed_rows} (page {page})")
+
+    def display_values(self, timestamp, values):
+        """
+        Converts one stored row into the values shown in the table.
+
+        Args:
+            timestamp: The ISO timestamp of the sample.
+            values: Sensor values in `headers` order, either raw numbers
+                (None or '' for no data) or already formatted strings.
+        """
+        display_ts = timestamp.split('T')[1].split('+')[0].split('.')[0]
+        formatted = []
+        for h, v in zip(headers[1:], values):
+            if isinstance(v, str):
+                try:
+                    v = float(v) if v else None
+                except ValueError:
+                    formatted.append(v)
+                    continue
+            formatted.append(format_value(SENSOR_BY_NAME[h], v))
+        return [display_ts] + formatted
+
     def update_ports_list(self):
-        """Scans for paired Bluetooth devices and populates the dropdown menu."""
-        self.log("Scanning for paired Bluetooth devices by MAC address...")
-        ports_with_mac = list_paired_bluetooth_ports()
+        """Starts a background scan for paired Bluetooth devices."""
+        if self.port_watcher.rescan():
+            self.log("Scanning for paired Bluetooth devices by MAC address...")
+        else:
+            self.log("A port scan is already running.")
+
+    def show_ports(self, ports_with_mac, cached=False):
+        """
+        Populates the dropdown menu with paired ports, keeping the current
+        selection if it is still available.
+
+        Args:
+            ports_with_mac: A list of (port, mac) tuples.
+            cached: True if the list comes from the previous session.
+        """
+        selected = self.port_combo.get()
         self.port_map = {f"{port} (MAC: {mac})": port for port, mac in ports_with_mac}
+        self.port_macs = {port: mac for port, mac in ports_with_mac}
+        config["PORT_CACHE"] = [list(p) for p in ports_with_mac]
         display_values = list(self.port_map.keys())
         self.port_combo['values'] = display_values
-        if display_values:
+        if selected in self.port_map:
+            self.port_combo.set(selected)
+        elif display_values:
             self.port_combo.current(0)
+        else:
+            self.port_combo.set('')
+        if cached:
+            if display_values:
+                self.log(f"Cached ports: {', '.join(display_values)}")
+        elif display_values:
             self.log(f"Found paired ports: {', '.join(display_values)}")
         else:
             self.log("No paired Bluetooth devices with valid MAC addresses found.")
-            self.port_combo.set('')
 
-    def log(self, msg):
+    def log(self, msg, level=logging.INFO):
         """
         Thread-safe method to write messages to the status log window.
+        Every message goes to the log file; only those at LOG_LEVEL or
+        above are shown in the window.
 
         Args:
             msg: The string message to log.
+            level: The logging level of the message.
         """
-        self.root.after(0, self._log_message, msg)
+        logger.log(level, msg)
+        if level >= LOG_LEVEL:
+            self.state.add_log(f"{datetime.now().strftime('%H:%M:%S')}: {msg}\n")
 
-    def _log_message(self, msg):
+    def _log_message(self, lines):
         """Internal method that performs the GUI update for logging."""
-        self.log_output.insert(tk.END, f"{datetime.now().strftime('%H:%M:%S')}: {msg}\n")
+        self.log_output.insert(tk.END, "".join(lines[-LOG_MAX_LINES:]))
+        line_count = int(self.log_output.index('end-1c').split('.')[0]) - 1
+        if line_count > LOG_MAX_LINES:
+            self.log_output.delete('1.0', f'{line_count - LOG_MAX_LINES + 1}.0')
         self.log_output.see(tk.END)
 
+    def gui_tick(self):
+        """
+        Periodic GUI refresh, run GUI_FPS times per second on the main
+        thread. Applies all pending rows and log lines in one batch.
+        """
+        self.apply_pending()
+        if self.daemon is not None:
+            self.poll_daemon()
+        elif self.daemon_wait_until is not None and not self.attach_daemon():
+            if time.monotonic() > self.daemon_wait_until:
+                self.daemon_wait_until = None
+                self.log("🚫 The acquisition process did not start. See the log file for details.", logging.ERROR)
+                self.update_ui_on_fail("Connection Failed")
+        self.root.after(int(1000 / GUI_FPS), self.gui_tick)
+
+    def apply_pending(self):
+        """Applies every row and log line published since the last frame."""
+        rows, log_lines = self.state.take()
+        ports = self.state.take_ports()
+        if ports is not None:
+            self.show_ports(ports)
+        if log_lines:
+            self._log_message(log_lines)
+        for timestamp, row_data in rows:
+            self.update_gui(timestamp, row_data)
+
+    def on_engine_event(self, event, data):
+        """
+        Receives acquisition engine events on the engine's threads and
+        hands them to the main thread.
+        """
+        if event == "log":
+            level, msg = data
+            if level >= LOG_LEVEL:
+                self.state.add_log(f"{datetime.now().strftime('%H:%M:%S')}: {msg}\n")
+        elif event == "row":
+            self.state.add_row(*data)
+        elif event == "connected":
+            self.root.after(0, self.update_ui_on_connect, data)
+        elif event == "connect_failed":
+            self.root.after(0, self.update_ui_on_fail, data)
+        elif event == "connection_lost":
+            self.root.after(0, self.disconnect)
+        elif event == "stopped":
+            self.root.after(0, lambda: self.monitor_btn.config(text="Start Monitoring"))
+
+    def start_daemon(self, port, vehicle, mac=None):
+        """
+        Launches the acquisition daemon as a detached process. gui_tick
+        attaches to it once its shared memory appears.
+        """
+        cmd = [sys.executable, os.path.abspath(__file__), "--daemon", "--port", port,
+               "--veh-no", vehicle[0], "--veh-type", vehicle[1], "--year", vehicle[2]]
+        if mac:
+            cmd += ["--mac", mac]
+        skipped = self.skipped_sensors()
+        if skipped:
+            cmd += ["--sensors", ",".join(h for h in headers[1:] if h not in skipped)]
+        if os.name == 'posix':
+            detach = {"start_new_session": True}
+        else:
+            detach = {"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+        try:
+            subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, **detach)
+        except OSError as e:
+            self.log(f"⛔ Could not start the acquisition process: {e}", logging.ERROR)
+            self.update_ui_on_fail("Connection Failed")
+            return
+        self.daemon_wait_until = time.monotonic() + DAEMON_START_TIMEOUT
+
+    def attach_daemon(self):
+        """
+        Attaches to a running acquisition daemon, if there is one.
+
+        Returns:
+            True if the GUI is now attached.
+        """
+        try:
+            client = DaemonClient()
+        except (FileNotFoundError, ValueError):
+            return False
+        if not client.alive():
+            client.close()
+            return False
+        self.daemon = client
+        self.daemon_wait_until = None
+        self.daemon_status = None
+        self.log("🔗 Attached to the acquisition process.")
+        return True
+
+    def poll_daemon(self):
+        """Applies the rows, log lines and status published by the daemon."""
+        alive = self.daemon.alive()
+        rows, events, lost = self.daemon.poll()
+        lines = [f"{stamp}: {data[1]}\n" for event, data, stamp in events
+                 if event == "log" and data[0] >= LOG_LEVEL]
+        if lines:
+            self._log_message(lines)
+        if lost:
+            self.log(f"⚠️ {lost} rows were not shown in time (they are still in the dataset).", logging.WARNING)
+        for timestamp, row_data in rows:
+            self.update_gui(timestamp, row_data)
+        if not alive:
+            self.daemon.close()
+            self.daemon = None
+            self.log("ℹ️ The acquisition process has exited.")
+            self.disconnect()
+            return
+        status = self.daemon.status()
+        if status != self.daemon_status:
+            self.daemon_status = status
+            self.show_daemon_status(status)
+
+    def show_daemon_status(self, status):
+        """Shows the daemon's connection state and vehicle in the GUI."""
+        vehicle = status.get("vehicle") or ["--"] * 3
+        port = status.get("port", "?")
+        self.display_veh_no.set(f"Vehicle No: {vehicle[0]}")
+        self.display_veh_type.set(f"Vehicle Type: {vehicle[1]}")
+        self.display_yr_mfr.set(f"Year: {vehicle[2]}")
+        if status.get("state") == "connected":
+            self.status_label.config(text=f"Status: Connected on {port} (acquisition process)", foreground="green")
+        else:
+            self.status_label.config(text=f"Status: Connecting to {port} (acquisition process)...", foreground="orange")
+        self.connect_btn.config(text="Disconnect", state='normal')
+        self.monitor_btn.config(text="Monitoring in process", state='disabled')
+        self.port_combo.config(state='disabled')
+        self.refresh_btn.config(state='disabled')
+
     def toggle_connection(self):
         """Handles the 'Connect'/'Disconnect' button click."""
-        if self.connection and self.connection.is_connected():
+        if self.daemon is not None or self.engine.is_connected():
             self.disconnect()
         else:
             self.connect()
     
     def connect(self):
         """
-        Initiates the connection process by launching a background thread
-        to prevent the GUI from freezing.
+        Initiates the connection process. The acquisition engine connects
+        in a background thread to prevent the GUI from freezing.
         """
         display_string = self.port_combo.get()
         if not display_string:
-            self.log("⚠️ Please select a paired port first.")
+            self.log("⚠️ Please select a paired port first.", logging.WARNING)
             return
         port = self.port_map.get(display_string)
         if not port:
             self.log(f"Error: Could not find port for '{display_string}'.")
             return
-        self.display_veh_no.set(f"Vehicle No: {self.veh_no.get()}")
-        self.display_veh_type.set(f"Vehicle Type: {self.veh_type.get()}")
-        self.display_yr_mfr.set(f"Year: {self.yr_mfr.get()}")
+        vehicle = (self.veh_no.get(), self.veh_type.get(), self.yr_mfr.get())
+        self.display_veh_no.set(f"Vehicle No: {vehicle[0]}")
+        self.display_veh_type.set(f"Vehicle Type: {vehicle[1]}")
+        self.display_yr_mfr.set(f"Year: {vehicle[2]}")
+        mac = self.port_macs.get(port)
         self.log(f"🚀 Starting connection process for {port}...")
         self.connect_btn.config(state='disabled')
         self.monitor_btn.config(state='disabled')
         self.port_combo.config(state='disabled')
         self.refresh_btn.config(state='disabled')
         self.status_label.config(text=f"Status: Connecting to {port}...", foreground="orange")
-        threading.Thread(target=self.attempt_connection_on_port, args=(port,), daemon=True).start()
-
-    def attempt_connection_on_port(self, port):
-        """
-        Runs in a background thread to connect to the OBD adapter. Includes
-        logic for retries and stabilization delays.
-        """
-        for attempt in range(1, 4):
-            self.log(f"🧪 Trying connection on {port} (Attempt {attempt}/3)...")
-            try:
-                conn = OBD(portstr=port, baudrate=BAUDRATE, fast=False, timeout=5)
-                if conn.is_connected():
-                    self.log(f"✅ Connection successful on {port}!")
-                    self.log("⏳ Stabilizing connection, please wait 5 seconds...")
-                    time.sleep(5)
-                    self.connection = conn
-                    self.root.after(0, self.update_ui_on_connect, port)
-                    return
-                else:
-                    self.log(f"❌ {port} did not respond as an OBD device.")
-                    conn.close()
-            except Exception as e:
-                self.log(f"⛔ Error on {port}: {str(e).strip()}")
-            time.sleep(2)
-        self.log(f"🚫 All connection attempts failed for {port}.")
-        self.root.after(0, self.update_ui_on_fail, "Connection Failed")
+        if self.use_process:
+            self.start_daemon(port, vehicle, mac)
+        else:
+            self.engine.connect(port, vehicle, mac)
 
     def update_ui_on_connect(self, port):
         """Helper method to safely update the GUI after a successful connection."""
@@ -387,96 +3464,55 @@ class OBDLoggerApp:
         self.connect_btn.config(text="Connect", state='normal')
         self.port_combo.config(state='readonly')
         self.refresh_btn.config(state='normal')
-        self.connection = None
 
     def disconnect(self):
         """
-        Disconnects from the OBD adapter. Runs the blocking `close()` call
-        in a thread to prevent the GUI from hanging.
+        Disconnects from the OBD adapter. The engine runs the blocking
+        `close()` call in a thread to prevent the GUI from hanging.
         """
         self.log("🔌 Disconnecting...")
         self.connect_btn.config(state='disabled')
-        if self.running:
+        if self.daemon is not None:
+            # The GUI resets once poll_daemon sees the process exit
+            self.daemon.request_stop()
+            return
+        if self.engine.running:
             self.toggle_monitoring()
-        if self.connection:
-            threading.Thread(target=self.connection.close, daemon=True).start()
-        self.connection = None
+        self.engine.disconnect()
         self.display_veh_no.set("Vehicle No: --")
         self.display_veh_type.set("Vehicle Type: --")
         self.display_yr_mfr.set("Year: --")
         self.status_label.config(text="Status: Disconnected", foreground="red")
         self.connect_btn.config(text="Connect", state='normal')
-        self.monitor_btn.config(state='disabled')
+        self.monitor_btn.config(text="Start Monitoring", state='disabled')
         self.port_combo.config(state='readonly')
         self.refresh_btn.config(state='normal')
         self.log("Disconnected successfully.")
 
     def toggle_monitoring(self):
         """Handles the 'Start/Stop Monitoring' button click."""
-        if self.running:
-            self.running = False
+        if self.engine.running:
+            self.engine.stop()
             self.monitor_btn.config(text="Start Monitoring")
             self.log("⏹️ Monitoring stopped.")
         else:
-            self.running = True
             self.monitor_btn.config(text="Stop Monitoring")
             self.log("▶️ Monitoring started...")
-            initialize_csv(CSV_FILENAME)
-            threading.Thread(target=self.monitor_data, daemon=True).start()
+            self.engine.start()
 
-    def monitor_data(self):
-        """
-        The main data-gathering loop. Runs in a background thread to
-        continuously query the vehicle for new data. Includes error handling.
+    def update_gui(self, timestamp, row_data):
         """
-        while self.running:
-            try:
-                if not self.connection or not self.connection.is_connected():
-                    self.log("⚠️ Connection lost! Stopping monitoring.")
-                    self.root.after(0, self.disconnect)
-                    break
+        Adds a sample row to the live table. Runs on the main thread; the
+        engine has already handed the row to the CSV writer.
 
-                now = datetime.now(pytz.timezone(TIMEZONE))
-                timestamp = now.isoformat()
-                self.log("Querying data from vehicle...")
-                data_points = {
-                    "Coolant Temp": get_formatted_value(self.connection.query(commands.COOLANT_TEMP)),
-                    "Oil Temp": get_formatted_value(self.connection.query(commands.OIL_TEMP)),
-                    "Engine RPM": get_formatted_value(self.connection.query(commands.RPM)),
-                    "Throttle Pos": get_formatted_value(self.connection.query(commands.THROTTLE_POS)),
-                    "Engine Load": get_formatted_value(self.connection.query(commands.ENGINE_LOAD)),
-                    "Speed": get_formatted_value(self.connection.query(commands.SPEED)),
-                    "Fuel Level": get_formatted_value(self.connection.query(commands.FUEL_LEVEL)),
-                    "Fuel Pressure": get_formatted_value(self.connection.query(commands.FUEL_PRESSURE)),
-                    "Intake Temp": get_formatted_value(self.connection.query(commands.INTAKE_TEMP)),
-                    "Ambient Temp": get_formatted_value(self.connection.query(commands.AMBIANT_AIR_TEMP)),
-                }
-                self.log("Data received. Updating GUI and CSV...")
-                row_data = [data_points.get(h, "N/A") for h in headers[1:]]
-                self.root.after(0, self.update_gui_and_csv, timestamp, row_data)
-                time.sleep(REFRESH_RATE)
-            except Exception as e:
-                self.log(f"⛔ ERROR in monitoring loop: {e}")
-                self.log("⏹️ Halting monitoring due to error.")
-                self.root.after(0, self.toggle_monitoring)
-                break
-        self.root.after(0, lambda: self.monitor_btn.config(text="Start Monitoring"))
-        self.running = False
-        
-    def update_gui_and_csv(self, timestamp, row_data):
-        """
-        Safely updates the GUI table and writes to the CSV file from the
-        main thread.
+        Args:
+            timestamp: The ISO timestamp of the sample.
+            row_data: Raw sensor values (or None) in `headers` order. They are
+                only formatted with units for display.
         """
-        # Update GUI
-        display_ts = timestamp.split('T')[1].split('+')[0].split('.')[0]
         if self.tree.winfo_exists():
-            # Insert new row at the top (index 0) of the GUI table
-            self.tree.insert('', 0, values=[display_ts] + row_data)
-
-        # Update CSV (append to the bottom)
-        full_row = [timestamp, self.veh_no.get(), self.veh_type.get(), self.yr_mfr.get()] + row_data
-        append_row_to_csv(CSV_FILENAME, full_row)
+            # Insert new row at the top (index 0) of the bounded live table
+            self.table.add(self.display_values(timestamp, row_data))
 
     def on_closing(self):
         """
@@ -484,18 +3520,173 @@ class OBDLoggerApp:
         Saves the latest vehicle configuration and closes the connection.
         """
         self.log("Exiting application...")
-        current_config = {
+        # Start from the file: a daemon may have saved adapter profiles since
+        saved = load_config()
+        saved.update({
             "VEH_NO": self.veh_no.get(),
             "VEH_TYPE": self.veh_type.get(),
-            "YR_MFR": self.yr_mfr.get()
-        }
-        save_config(current_config)
-        if self.connection and self.connection.is_connected():
-            threading.Thread(target=self.connection.close, daemon=True).start()
+            "YR_MFR": self.yr_mfr.get(),
+            "PORT_CACHE": config.get("PORT_CACHE", []),
+            "HIDDEN_COLUMNS": [h for h, var in self.column_vars.items() if not var.get()],
+            "POLL_VISIBLE_ONLY": self.poll_visible_only.get()
+        })
+        save_config(saved)
+        self.port_watcher.stop()
+        if self.daemon is not None:
+            self.log("ℹ️ The acquisition process keeps running; reopen the GUI to attach.")
+            self.daemon.close()
+        self.engine.close()
+        self.apply_pending()
+        self.log_listener.stop()
         self.root.destroy()
 
+# -------------------- Headless Mode --------------------
+def run_headless(args):
+    """
+    Runs the acquisition engine without a GUI, printing the status log to
+    the console. The adapter is reconnected after failures, so this can run
+    as a service on a machine without a display.
+
+    In daemon mode, rows and events are also published to shared memory,
+    where GUI processes can attach and detach while logging continues.
+
+    Args:
+        args: Parsed command-line arguments (see parse_args).
+
+    Returns:
+        The number of rows logged.
+    """
+    vehicle = (args.veh_no, args.veh_type, args.year)
+    publisher = None
+    if args.daemon:
+        try:
+            publisher = DaemonPublisher(vehicle, args.port)
+        except FileExistsError:
+            print("⛔ An acquisition process is already running.")
+            return 0
+    log_listener = setup_file_logging(LOG_FILE)
+    engine = AcquisitionEngine(args.period, args.storage, args.compress)
+    events = queue.Queue()
+    engine.subscribe(lambda event, data: events.put((event, data)))
+    if publisher is not None:
+        engine.subscribe(publisher)
+    mac = args.mac or port_mac(args.port)
+    engine.set_skipped(args.skipped)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    rows = 0
+    started = time.monotonic()
+    stop_at = started + args.duration if args.duration else None
+    retry_at = None
+    print(f"🚀 Headless logging on {args.port} for {vehicle[0]} ({vehicle[1]}, {vehicle[2]}). Ctrl+C to stop.")
+    engine.connect(args.port, vehicle, mac)
+    try:
+        while stop_at is None or time.monotonic() < stop_at:
+            if publisher is not None and publisher.stop_requested():
+                print("⏹️ Stop requested by the GUI.")
+                break
+            if retry_at is not None and time.monotonic() >= retry_at:
+                retry_at = None
+                if engine.is_connected():
+                    engine.start()
+                else:
+                    engine.connect(args.port, vehicle, mac)
+            try:
+                event, data = events.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if event == "log":
+                level, msg = data
+                if level >= LOG_LEVEL:
+                    print(f"{datetime.now().strftime('%H:%M:%S')}: {msg}")
+            elif event == "row":
+                rows += 1
+            elif event == "connected":
+                engine.start()
+            elif event in ("connect_failed", "connection_lost", "stopped"):
+                print(f"🔁 Retrying in {RECONNECT_DELAY:.0f} s...")
+                retry_at = time.monotonic() + RECONNECT_DELAY
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+        if publisher is not None:
+            engine.unsubscribe(publisher)
+            publisher.close()
+        log_listener.stop()
+    elapsed = time.monotonic() - started
+    print(f"⏹️ Logged {rows} rows in {elapsed:.1f} s.")
+    return rows
+
+def run_export(args):
+    """
+    Exports one vehicle's rows in a time range from the SQLite dataset to a
+    CSV file, using the (vehicle, timestamp) index. Works while logging.
+
+    Args:
+        args: Parsed command-line arguments (see parse_args).
+    """
+    rows = query_dataset(SQLITE_FILENAME, args.veh_no, args.since, args.until)
+    with open(args.export, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(DATASET_COLUMNS)
+        writer.writerows(rows)
+    print(f"📤 Exported {len(rows)} rows for {args.veh_no} to {args.export}.")
+
+def parse_args():
+    """Parses the command-line options."""
+    parser = argparse.ArgumentParser(description="OBD-II data logger. Starts the GUI unless --headless is given.")
+    parser.add_argument("--headless", action="store_true",
+                        help="log without a GUI (for machines without a display)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="headless, and publish live data to shared memory for GUIs to attach to")
+    parser.add_argument("--process", action="store_true", default=ACQUISITION_PROCESS,
+                        help="GUI: run acquisition in a separate daemon process")
+    parser.add_argument("--port", help="serial port of the adapter (required with --headless/--daemon)")
+    parser.add_argument("--mac", type=str.upper,
+                        help="MAC address of the adapter, for its cached profile (default: looked up from --port)")
+    parser.add_argument("--veh-no", default=config.get("VEH_NO"), help="vehicle number")
+    parser.add_argument("--veh-type", default=config.get("VEH_TYPE"), help="vehicle type")
+    parser.add_argument("--year", default=config.get("YR_MFR"), help="year of manufacture")
+    parser.add_argument("--sensors", metavar="NAMES",
+                        help="comma-separated sensors to poll, e.g. 'Engine RPM,Speed'; "
+                             "the others are logged empty (default: all)")
+    parser.add_argument("--period", type=float, default=REFRESH_RATE,
+                        help=f"seconds between logged rows (default: {REFRESH_RATE})")
+    parser.add_argument("--storage", choices=["csv", "partitioned", "parquet", "sqlite"], default=STORAGE_BACKEND,
+                        help=f"dataset format (default: {STORAGE_BACKEND})")
+    parser.add_argument("--compress", choices=["gzip", "zstd"], default=DATASET_COMPRESSION,
+                        help="compress CSV datasets, with a crash-safe flush point per group commit")
+    parser.add_argument("--export", metavar="CSV_FILE",
+                        help="export --veh-no's rows from the SQLite dataset to a CSV file and exit")
+    parser.add_argument("--since", help="with --export: first ISO timestamp to include")
+    parser.add_argument("--until", help="with --export: ISO timestamp to stop before")
+    parser.add_argument("--duration", type=float, default=0,
+                        help="stop after this many seconds (default: run until interrupted)")
+    args = parser.parse_args()
+    args.headless = args.headless or args.daemon
+    if args.headless and not args.port:
+        parser.error("--headless and --daemon require --port")
+    if args.period <= 0:
+        parser.error("--period must be positive")
+    args.skipped = []
+    if args.sensors:
+        names = {h.lower(): h for h in headers[1:]}
+        wanted = [n.strip().lower() for n in args.sensors.split(",") if n.strip()]
+        unknown = [n for n in wanted if n not in names]
+        if unknown:
+            parser.error(f"unknown sensor(s): {', '.join(unknown)}; choose from: {', '.join(headers[1:])}")
+        args.skipped = [h for h in headers[1:] if h.lower() not in wanted]
+    return args
+
 # -------------------- Main Entry Point --------------------
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = OBDLoggerApp(root)
-    root.mainloop()
\ No newline at end of file
+    args = parse_args()
+    if args.export:
+        run_export(args)
+    elif args.headless:
+        run_headless(args)
+    else:
+        root = tk.Tk()
+        app = OBDLoggerApp(root, use_process=args.process)
+        root.mainloop()
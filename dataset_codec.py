@@ -0,0 +1,114 @@
+"""
+=======================================================================
+    Dataset Codec — Crash-tolerant reading of compressed OBD datasets
+=======================================================================
+
+📄 File Name: dataset_codec.py
+📅 Last Modified: 2026-10-17
+
+📄 Description:
+    Reads the dataset files written by the logger (OBD-v6.py), plain or
+    gzip/zstd compressed. Shared by the logger and the emulator
+    (OBD-emulator.py), which replays the same files.
+
+🔧 Features:
+    - Recognises gzip and zstd files by their magic bytes.
+    - Reads a member (frame) cut short by a crash up to its last flush
+      point, and resumes at the next member if a later session appended one.
+    - Drops a trailing partial line.
+
+🛠 Dependencies:
+    - Python standard library only
+    - zstandard (optional, for .zst datasets)
+"""
+import zlib
+
+def decompress_dataset(data):
+    """
+    Decompresses a gzip or zstd dataset written as one member (frame) per
+    session. A member cut short by a crash is read up to its last flush
+    point: its output is kept up to the last complete line, and reading
+    resumes at the next member if a later session appended one.
+
+    Args:
+        data: The compressed file contents.
+
+    Returns:
+        A tuple (data, complete): the decompressed bytes, and whether every
+        member ended cleanly.
+    """
+    if data[:2] == b"\x1f\x8b":
+        magic = b"\x1f\x8b\x08"
+        new_decoder, errors = (lambda: zlib.decompressobj(16 + zlib.MAX_WBITS)), zlib.error
+    else:
+        import zstandard
+        magic = b"\x28\xb5\x2f\xfd"
+        new_decoder, errors = zstandard.ZstdDecompressor().decompressobj, zstandard.ZstdError
+    parts = []
+    complete = True
+    while data:
+        decoder = new_decoder()
+        out = []
+        pos = 0
+        while pos < len(data) and not decoder.eof:
+            try:
+                out.append(decoder.decompress(data[pos:pos + 65536]))
+            except errors:
+                break
+            pos += 65536
+        if decoder.eof:
+            parts.extend(out)
+            data = decoder.unused_data + data[pos:]
+            continue
+        complete = False
+        if pos >= len(data):
+            # Cut short with nothing after it: keep what decoded
+            member = b"".join(out)
+            parts.append(member[:member.rfind(b"\n") + 1])
+            break
+        # A decoder error discards the output of the whole slice, so redo
+        # the failing slice byte by byte, noting the output size after each
+        # byte, until the decoder fails on the next member (or on garbage).
+        decoder = new_decoder()
+        member = decoder.decompress(data[:pos]) if pos else b""
+        sizes = [len(member)]
+        fail = pos
+        try:
+            while fail < len(data) and not decoder.eof:
+                member += decoder.decompress(data[fail:fail + 1])
+                sizes.append(len(member))
+                fail += 1
+        except errors:
+            pass
+        # The next member starts where the decoder failed, or just before;
+        # if the tail is garbage instead, it may start further on.
+        following = data.rfind(magic, max(pos, 1), fail + len(magic))
+        if following < 0:
+            following = data.find(magic, fail + 1)
+        else:
+            member = member[:sizes[following - pos]]
+        parts.append(member[:member.rfind(b"\n") + 1])
+        if following < 0:
+            break
+        data = data[following:]
+    return b"".join(parts), complete
+
+def read_dataset_text(file_path):
+    """
+    Reads a dataset file as text, decompressing gzip and zstd files
+    transparently (recognised by their magic bytes, not the file name). A
+    compressed file cut short by a crash is read up to its last flush point,
+    and a trailing partial line is dropped.
+
+    Args:
+        file_path: The path to a plain, .gz or .zst dataset file.
+
+    Returns:
+        The file's text.
+    """
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    if data[:2] != b"\x1f\x8b" and data[:4] != b"\x28\xb5\x2f\xfd":
+        return data.decode('utf-8-sig')
+    text = decompress_dataset(data)[0].decode('utf-8-sig', errors='replace')
+    return text[:text.rfind("\n") + 1]